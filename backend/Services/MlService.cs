@@ -10,6 +10,11 @@ public class MlService : IMlService
     private readonly IConfiguration _configuration;
     private readonly string _mlServiceUrl;
 
+    // Polling starts fast so small fits and cache hits return quickly, then backs off
+    private static readonly TimeSpan TrainingPollInitialInterval = TimeSpan.FromMilliseconds(50);
+    private static readonly TimeSpan TrainingPollMaxInterval = TimeSpan.FromSeconds(1);
+    private static readonly TimeSpan TrainingTimeout = TimeSpan.FromMinutes(30);
+
     public MlService(HttpClient httpClient, IConfiguration configuration)
     {
         _httpClient = httpClient;
@@ -31,6 +36,7 @@ public class MlService : IMlService
 
         try
         {
+            // Training runs as a background job in the ML service: submit it, then poll until it finishes
             var response = await _httpClient.PostAsync($"{_mlServiceUrl}/train", content);
             
             if (!response.IsSuccessStatusCode)
@@ -39,7 +45,41 @@ public class MlService : IMlService
                 throw new HttpRequestException($"ML service error: {response.StatusCode} - {errorContent}");
             }
 
-            var responseContent = await response.Content.ReadAsStringAsync();
+            var jobContent = await response.Content.ReadAsStringAsync();
+            var job = JsonSerializer.Deserialize<JsonElement>(jobContent);
+            var jobId = job.GetProperty("job_id").GetString();
+            // Cache hits come back already completed and need no polling
+            var status = job.GetProperty("status").GetString();
+
+            var deadline = DateTime.UtcNow.Add(TrainingTimeout);
+            var pollInterval = TrainingPollInitialInterval;
+            while (status != "completed" && status != "failed")
+            {
+                if (DateTime.UtcNow > deadline)
+                {
+                    throw new TimeoutException($"Training job {jobId} did not finish within {TrainingTimeout.TotalMinutes} minutes");
+                }
+
+                await Task.Delay(pollInterval);
+                pollInterval = TimeSpan.FromTicks(Math.Min(pollInterval.Ticks * 2, TrainingPollMaxInterval.Ticks));
+
+                var statusResponse = await _httpClient.GetAsync($"{_mlServiceUrl}/train/{jobId}");
+                var statusContent = await statusResponse.Content.ReadAsStringAsync();
+                if (!statusResponse.IsSuccessStatusCode)
+                {
+                    throw new HttpRequestException($"ML service error: {statusResponse.StatusCode} - {statusContent}");
+                }
+
+                status = JsonSerializer.Deserialize<JsonElement>(statusContent).GetProperty("status").GetString();
+            }
+
+            var resultResponse = await _httpClient.GetAsync($"{_mlServiceUrl}/train/{jobId}/result");
+            var responseContent = await resultResponse.Content.ReadAsStringAsync();
+            if (!resultResponse.IsSuccessStatusCode)
+            {
+                throw new HttpRequestException($"ML service error: {resultResponse.StatusCode} - {responseContent}");
+            }
+
             var mlResponse = JsonSerializer.Deserialize<JsonElement>(responseContent);
 
             return new TrainingResponse
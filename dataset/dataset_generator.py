@@ -7,8 +7,77 @@ Generates realistic manufacturing quality control datasets for demo purposes.
 import pandas as pd
 import numpy as np
 import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+import argparse
 import os
+import sys
+
+# Rows per generated chunk in the vectorized mode; memory use scales with this, not the row count
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Upper bound of the scripted default time span (rows/25 days would reach back past year 1 for huge runs)
+DEFAULT_MAX_DAYS = 365
+
+# Interactive runs above this size switch to the vectorized, streaming generator
+VECTORIZED_MIN_ROWS = 100_000
+
+SENSORS = ['temperature', 'pressure', 'vibration', 'speed']
+
+# Normal (mean, std) per sensor for each operating mode, same order as SENSORS
+PASS_MODE = 0
+FAILURE_MODES = ['overheat', 'pressure', 'vibration', 'speed', 'multiple']
+MODE_MEANS = np.array([
+    [72, 1.25, 0.12, 1450],    # normal/optimal operating conditions
+    [85, 1.3, 0.2, 1480],      # overheat
+    [74, 2.2, 0.15, 1520],     # pressure
+    [73, 1.4, 0.55, 1460],     # vibration
+    [75, 1.35, 0.18, 1680],    # speed
+    [88, 2.4, 0.65, 1650],     # multiple failures
+])
+MODE_STDS = np.array([
+    [2.5, 0.15, 0.03, 40],
+    [3, 0.2, 0.05, 50],
+    [2, 0.3, 0.04, 60],
+    [2, 0.2, 0.15, 50],
+    [2, 0.2, 0.05, 80],
+    [4, 0.4, 0.2, 100],
+])
+# Probability that a row is labelled 'fail' in the pass mode and in the failure modes
+PASS_MODE_FAIL_RATE = 0.02
+FAILURE_MODE_FAIL_RATE = 0.9
+
+SENSOR_LOWER = np.array([60, 0.5, 0.05, 1200])
+SENSOR_UPPER = np.array([95, 3.5, 1.0, 1800])
+
+# Uniform ranges of the special cases injected every 50 rows
+PERFECT_LOWER = np.array([70, 1.15, 0.08, 1430])
+PERFECT_UPPER = np.array([73, 1.35, 0.12, 1470])
+BREAKDOWN_LOWER = np.array([90, 2.8, 0.8, 1700])
+BREAKDOWN_UPPER = np.array([95, 3.5, 1.0, 1800])
+
+# Stress-test profiles on top of the standard columns: extra correlated sensors,
+# zero (idle) readings, missing values, categorical columns and drift over time
+PROFILE_DEFAULTS = {
+    'sensors': 0,            # extra sensor columns sensor_0000 ... (correlated through latent factors)
+    'latent_factors': 8,     # shared hidden factors besides the four base sensors
+    'sparsity': 0.0,         # share of extra sensor readings that are exactly 0
+    'missing_rate': 0.0,     # share of extra sensor and categorical values left empty
+    'categoricals': {},      # column name -> cardinality
+    'drift': 0.0,            # sensor mean shift over the whole time span, in standard deviations
+}
+GENERATOR_PROFILES = {
+    'standard': {},
+    'wide': {'sensors': 600, 'sparsity': 0.3, 'missing_rate': 0.05, 'drift': 0.5,
+             'categoricals': {'machine_id': 200, 'shift': 3, 'supplier': 40}},
+    'high-cardinality': {'sensors': 20, 'latent_factors': 4, 'missing_rate': 0.02, 'drift': 0.2,
+                         'categoricals': {'machine_id': 5000, 'shift': 3, 'supplier': 1000, 'batch_id': 50000}},
+}
+# Keeps chunks of wide profiles to about 40 MB of float32 sensor values
+MAX_CHUNK_CELLS = 10_000_000
+# Categories that are over-represented among failing rows, and by how much
+BAD_CATEGORY_SHARE = 0.1
+BAD_CATEGORY_BOOST = 4.0
 
 def get_user_input():
     """Get dataset parameters from user"""
@@ -61,13 +130,13 @@ def get_user_input():
     
     return rows, days, pass_rate, filename
 
-def generate_realistic_data(num_rows, time_span_days, target_pass_rate):
+def generate_realistic_data(num_rows, time_span_days, target_pass_rate, seed=42):
     """Generate realistic manufacturing sensor data"""
     data = []
     
-    # Set random seed for some consistency but allow variation
-    np.random.seed(42)
-    random.seed(42)
+    # Local generators keep runs reproducible without touching the global random state
+    rng = random.Random(seed)
+    np_rng = np.random.RandomState(seed)
     
     # Calculate time parameters
     end_date = datetime.now()
@@ -87,60 +156,60 @@ def generate_realistic_data(num_rows, time_span_days, target_pass_rate):
         
         # Generate timestamp
         timestamp = start_date + timedelta(
-            days=random.uniform(0, time_span_days),
-            hours=random.uniform(0, 24),
-            minutes=random.uniform(0, 60)
+            days=rng.uniform(0, time_span_days),
+            hours=rng.uniform(0, 24),
+            minutes=rng.uniform(0, 60)
         )
         
         # Determine if this should be a failure based on target rate
-        should_fail = random.random() < target_fail_rate
+        should_fail = rng.random() < target_fail_rate
         
         if not should_fail:  # Generate PASS conditions
             # Normal/optimal operating conditions
-            temperature = np.random.normal(72, 2.5)    # Optimal: 69-75°C
-            pressure = np.random.normal(1.25, 0.15)    # Optimal: 1.1-1.4
-            vibration = np.random.normal(0.12, 0.03)   # Low vibration: 0.09-0.15
-            speed = np.random.normal(1450, 40)         # Optimal: 1410-1490 RPM
+            temperature = np_rng.normal(72, 2.5)    # Optimal: 69-75°C
+            pressure = np_rng.normal(1.25, 0.15)    # Optimal: 1.1-1.4
+            vibration = np_rng.normal(0.12, 0.03)   # Low vibration: 0.09-0.15
+            speed = np_rng.normal(1450, 40)         # Optimal: 1410-1490 RPM
             
             # Small chance of failure even in good conditions (realistic)
-            quality = 'fail' if random.random() < 0.02 else 'pass'
+            quality = 'fail' if rng.random() < 0.02 else 'pass'
             
         else:  # Generate FAIL conditions
             # Choose failure mode randomly
-            failure_mode = random.choice(['overheat', 'pressure', 'vibration', 'speed', 'multiple'])
+            failure_mode = rng.choice(['overheat', 'pressure', 'vibration', 'speed', 'multiple'])
             
             if failure_mode == 'overheat':
-                temperature = np.random.normal(85, 3)      # High temp
-                pressure = np.random.normal(1.3, 0.2)      # Normal pressure
-                vibration = np.random.normal(0.2, 0.05)    # Slight vibration
-                speed = np.random.normal(1480, 50)         # Slightly high speed
+                temperature = np_rng.normal(85, 3)      # High temp
+                pressure = np_rng.normal(1.3, 0.2)      # Normal pressure
+                vibration = np_rng.normal(0.2, 0.05)    # Slight vibration
+                speed = np_rng.normal(1480, 50)         # Slightly high speed
                 
             elif failure_mode == 'pressure':
-                temperature = np.random.normal(74, 2)      # Normal temp
-                pressure = np.random.normal(2.2, 0.3)      # High pressure
-                vibration = np.random.normal(0.15, 0.04)   # Normal vibration
-                speed = np.random.normal(1520, 60)         # Higher speed
+                temperature = np_rng.normal(74, 2)      # Normal temp
+                pressure = np_rng.normal(2.2, 0.3)      # High pressure
+                vibration = np_rng.normal(0.15, 0.04)   # Normal vibration
+                speed = np_rng.normal(1520, 60)         # Higher speed
                 
             elif failure_mode == 'vibration':
-                temperature = np.random.normal(73, 2)      # Normal temp
-                pressure = np.random.normal(1.4, 0.2)      # Normal pressure  
-                vibration = np.random.normal(0.55, 0.15)   # High vibration
-                speed = np.random.normal(1460, 50)         # Normal speed
+                temperature = np_rng.normal(73, 2)      # Normal temp
+                pressure = np_rng.normal(1.4, 0.2)      # Normal pressure  
+                vibration = np_rng.normal(0.55, 0.15)   # High vibration
+                speed = np_rng.normal(1460, 50)         # Normal speed
                 
             elif failure_mode == 'speed':
-                temperature = np.random.normal(75, 2)      # Slightly high temp
-                pressure = np.random.normal(1.35, 0.2)     # Normal pressure
-                vibration = np.random.normal(0.18, 0.05)   # Normal vibration
-                speed = np.random.normal(1680, 80)         # Very high speed
+                temperature = np_rng.normal(75, 2)      # Slightly high temp
+                pressure = np_rng.normal(1.35, 0.2)     # Normal pressure
+                vibration = np_rng.normal(0.18, 0.05)   # Normal vibration
+                speed = np_rng.normal(1680, 80)         # Very high speed
                 
             else:  # multiple failures
-                temperature = np.random.normal(88, 4)      # High temp
-                pressure = np.random.normal(2.4, 0.4)      # High pressure
-                vibration = np.random.normal(0.65, 0.2)    # High vibration
-                speed = np.random.normal(1650, 100)        # High speed
+                temperature = np_rng.normal(88, 4)      # High temp
+                pressure = np_rng.normal(2.4, 0.4)      # High pressure
+                vibration = np_rng.normal(0.65, 0.2)    # High vibration
+                speed = np_rng.normal(1650, 100)        # High speed
             
             # Mostly fails, but occasional pass (equipment sometimes survives stress)
-            quality = 'fail' if random.random() < 0.9 else 'pass'
+            quality = 'fail' if rng.random() < 0.9 else 'pass'
         
         # Ensure realistic bounds
         temperature = max(60, min(95, temperature))
@@ -150,20 +219,20 @@ def generate_realistic_data(num_rows, time_span_days, target_pass_rate):
         
         # Add some special cases every 50 rows for variety
         if i % 50 == 0 and i > 0:
-            if random.random() < 0.3:  # 30% chance of extreme case
-                if random.random() < 0.5:
+            if rng.random() < 0.3:  # 30% chance of extreme case
+                if rng.random() < 0.5:
                     # Perfect conditions
-                    temperature = random.uniform(70, 73)
-                    pressure = random.uniform(1.15, 1.35)
-                    vibration = random.uniform(0.08, 0.12)
-                    speed = random.uniform(1430, 1470)
+                    temperature = rng.uniform(70, 73)
+                    pressure = rng.uniform(1.15, 1.35)
+                    vibration = rng.uniform(0.08, 0.12)
+                    speed = rng.uniform(1430, 1470)
                     quality = 'pass'
                 else:
                     # Equipment failure
-                    temperature = random.uniform(90, 95)
-                    pressure = random.uniform(2.8, 3.5)
-                    vibration = random.uniform(0.8, 1.0)
-                    speed = random.uniform(1700, 1800)
+                    temperature = rng.uniform(90, 95)
+                    pressure = rng.uniform(2.8, 3.5)
+                    vibration = rng.uniform(0.8, 1.0)
+                    speed = rng.uniform(1700, 1800)
                     quality = 'fail'
         
         data.append({
@@ -177,6 +246,343 @@ def generate_realistic_data(num_rows, time_span_days, target_pass_rate):
     
     return data
 
+def _generate_rows(rng, count, first_index, fail_rate):
+    """Draws sensor values and quality labels for one chunk of rows"""
+    # Pick the operating mode per row, then draw every sensor from its mode's normal in one call
+    should_fail = rng.random(count) < fail_rate
+    modes = np.where(should_fail, rng.integers(1, len(FAILURE_MODES) + 1, count), PASS_MODE)
+    values = rng.normal(MODE_MEANS[modes], MODE_STDS[modes])
+    fails = rng.random(count) < np.where(should_fail, FAILURE_MODE_FAIL_RATE, PASS_MODE_FAIL_RATE)
+
+    # Ensure realistic bounds
+    np.clip(values, SENSOR_LOWER, SENSOR_UPPER, out=values)
+
+    # Special cases every 50 rows: perfect conditions or equipment failure
+    index = np.arange(first_index, first_index + count)
+    special = (index % 50 == 0) & (index > 0) & (rng.random(count) < 0.3)
+    perfect = rng.random(count) < 0.5
+    if special.any():
+        lower = np.where(perfect[special, None], PERFECT_LOWER, BREAKDOWN_LOWER)
+        upper = np.where(perfect[special, None], PERFECT_UPPER, BREAKDOWN_UPPER)
+        values[special] = rng.uniform(lower, upper)
+        fails[special] = ~perfect[special]
+
+    return {
+        'temperature': np.round(values[:, 0], 1),
+        'pressure': np.round(values[:, 1], 2),
+        'vibration': np.round(values[:, 2], 2),
+        'speed': values[:, 3].astype(np.int64),
+        'fail': fails,
+    }
+
+
+def resolve_profile(name='standard', **overrides):
+    """Profile settings with any non-None overrides applied"""
+    if name not in GENERATOR_PROFILES:
+        raise ValueError(f"Unknown profile '{name}', expected one of {', '.join(GENERATOR_PROFILES)}")
+    profile = dict(PROFILE_DEFAULTS, **GENERATOR_PROFILES[name])
+    profile.update({key: value for key, value in overrides.items() if value is not None})
+    return profile
+
+
+def build_layout(profile, seed=42):
+    """Fixed per-dataset structure of a profile: loadings, scales and category weights
+
+    Built from the seed alone so every chunk and every worker shard shares it.
+    Returns None for profiles that only produce the standard columns.
+    """
+    if not profile['sensors'] and not profile['categoricals']:
+        return None
+    rng = np.random.default_rng([seed, 1])
+    n, k = profile['sensors'], profile['latent_factors']
+
+    # Sensors mix the standardized base sensors (so they carry signal about quality),
+    # shared latent factors (so they correlate with each other) and their own noise
+    base_loadings = rng.normal(0, 1, (len(SENSORS), n)) * rng.random(n) ** 2
+    latent_loadings = rng.normal(0, 1, (k, n)) * rng.uniform(0.5, 2.0, n) / np.sqrt(max(k, 1))
+    noise_scales = rng.uniform(0.2, 1.0, n)
+    # Approximate standard deviation of each sensor, so drift is relative to its spread
+    spread = np.sqrt((base_loadings ** 2).sum(axis=0) + (latent_loadings ** 2).sum(axis=0) + noise_scales ** 2)
+    layout = {
+        'profile': profile,
+        'sensor_names': [f'sensor_{j:04d}' for j in range(n)],
+        'base_loadings': base_loadings.astype(np.float32),
+        'latent_loadings': latent_loadings.astype(np.float32),
+        'noise_scales': noise_scales.astype(np.float32),
+        'drift_directions': (rng.choice([-1.0, 1.0], n) * rng.uniform(0.5, 1.0, n) * spread).astype(np.float32),
+        'offsets': rng.uniform(0, 100, n).astype(np.float32),
+        'scales': (10 ** rng.uniform(-1, 2, n)).astype(np.float32),
+        'categoricals': {},
+    }
+
+    for name, cardinality in profile['categoricals'].items():
+        prefix = name.split('_')[0][:3].upper()
+        width = len(str(cardinality - 1))
+        # Zipf-like popularity, with a few categories that fail more often
+        weights = rng.permutation(1.0 / np.arange(1, cardinality + 1) ** 1.1)
+        fail_weights = weights * np.where(rng.random(cardinality) < BAD_CATEGORY_SHARE, BAD_CATEGORY_BOOST, 1.0)
+        layout['categoricals'][name] = {
+            'values': np.array([f'{prefix}-{i:0{width}d}' for i in range(cardinality)] + [None], dtype=object),
+            'pass_cdf': np.cumsum(weights / weights.sum()),
+            'fail_cdf': np.cumsum(fail_weights / fail_weights.sum()),
+        }
+    return layout
+
+
+def _generate_profile_columns(rng, layout, chunk, span_seconds):
+    """Draws the extra sensor and categorical columns of a profile for one chunk"""
+    profile = layout['profile']
+    count = len(chunk['fail'])
+    columns = {}
+
+    if profile['sensors']:
+        n, k = profile['sensors'], profile['latent_factors']
+        base = np.column_stack([chunk[sensor] for sensor in SENSORS])
+        standardized = ((base - MODE_MEANS[PASS_MODE]) / MODE_STDS[PASS_MODE]).astype(np.float32)
+        values = standardized @ layout['base_loadings']
+        if k:
+            values += rng.standard_normal((count, k), dtype=np.float32) @ layout['latent_loadings']
+        values += rng.standard_normal((count, n), dtype=np.float32) * layout['noise_scales']
+        if profile['drift']:
+            elapsed = (chunk['offset'] / span_seconds).astype(np.float32)
+            values += np.outer(elapsed, layout['drift_directions'] * np.float32(profile['drift']))
+        values *= layout['scales']
+        values += layout['offsets']
+        if profile['sparsity']:
+            values[rng.random((count, n), dtype=np.float32) < profile['sparsity']] = 0
+        if profile['missing_rate']:
+            values[rng.random((count, n), dtype=np.float32) < profile['missing_rate']] = np.nan
+        columns['sensors'] = values
+
+    for name, categorical in layout['categoricals'].items():
+        draws = rng.random(count)
+        codes = np.where(chunk['fail'], np.searchsorted(categorical['fail_cdf'], draws),
+                         np.searchsorted(categorical['pass_cdf'], draws))
+        np.minimum(codes, len(categorical['values']) - 2, out=codes)
+        if profile['missing_rate']:
+            codes[rng.random(count) < profile['missing_rate']] = len(categorical['values']) - 1
+        columns['category:' + name] = codes
+    return columns
+
+
+def _chunk_frame(chunk, start, layout):
+    frame = pd.DataFrame({
+        'timestamp': start + chunk['offset'].astype(np.int64).astype('timedelta64[s]'),
+        'temperature': chunk['temperature'],
+        'pressure': chunk['pressure'],
+        'vibration': chunk['vibration'],
+        'speed': chunk['speed'],
+    })
+    if layout is not None:
+        parts = [frame]
+        if 'sensors' in chunk:
+            parts.append(pd.DataFrame(chunk['sensors'], columns=layout['sensor_names'], copy=False))
+        categoricals = {name: categorical['values'][chunk['category:' + name]]
+                        for name, categorical in layout['categoricals'].items()}
+        if categoricals:
+            parts.append(pd.DataFrame(categoricals))
+        frame = pd.concat(parts, axis=1)
+    frame['quality'] = np.where(chunk['fail'], 'fail', 'pass')
+    return frame
+
+
+def generate_chunks(num_rows, time_span_days, target_pass_rate, chunk_size=DEFAULT_CHUNK_SIZE,
+                    seed=42, end_date=None, days_range=None, first_index=0, layout=None):
+    """Yields DataFrame chunks of synthetic sensor data in timestamp order
+
+    Vectorized counterpart of generate_realistic_data with the same distributions.
+    Rows are drawn in time windows of about chunk_size rows; timestamps spill up
+    to 25 hours past their window, so rows that may still be preceded by later
+    windows are carried over until the output order is final.
+
+    seed may be an int or a numpy SeedSequence. days_range and first_index restrict
+    the output to one shard: rows whose day offset falls in [first, last) days, with
+    row numbering (for the special cases) starting at first_index. layout (see
+    build_layout) adds the extra columns of a stress-test profile.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = end_date or datetime.now()
+    start = np.datetime64(end_date - timedelta(days=time_span_days), 's')
+    fail_rate = (100 - target_pass_rate) / 100
+
+    first_day, last_day = days_range or (0, time_span_days)
+    if layout is not None:
+        width = layout['profile']['sensors'] + len(layout['categoricals'])
+        chunk_size = min(chunk_size, max(1000, MAX_CHUNK_CELLS // max(width, 1)))
+    n_windows = max(1, -(-num_rows // chunk_size))
+    window_seconds = (last_day - first_day) * 86400.0 / n_windows
+    window_counts = rng.multinomial(num_rows, [1.0 / n_windows] * n_windows)
+
+    carry = None
+    generated = first_index
+    for window, count in enumerate(window_counts):
+        window_start = first_day * 86400.0 + window * window_seconds
+        # Same timestamp draw as the row-wise generator: day offset + up to 24h + up to 60min
+        offsets = (rng.uniform(window_start, window_start + window_seconds, count)
+                   + rng.uniform(0, 86400, count) + rng.uniform(0, 3600, count))
+        chunk = _generate_rows(rng, count, generated, fail_rate)
+        chunk['offset'] = offsets
+        if layout is not None:
+            chunk.update(_generate_profile_columns(rng, layout, chunk, time_span_days * 86400.0))
+        generated += count
+
+        if carry is not None:
+            chunk = {key: np.concatenate([carry[key], values]) for key, values in chunk.items()}
+        order = np.argsort(chunk['offset'], kind='stable')
+        chunk = {key: values[order] for key, values in chunk.items()}
+
+        # Later windows only produce offsets >= their start, so everything before it is final
+        if window < n_windows - 1:
+            ready = int(np.searchsorted(chunk['offset'], window_start + window_seconds))
+            carry = {key: values[ready:] for key, values in chunk.items()}
+            chunk = {key: values[:ready] for key, values in chunk.items()}
+        if len(chunk['offset']) == 0:
+            continue
+
+        yield _chunk_frame(chunk, start, layout)
+
+
+def _open_writer(filename, file_format, schema):
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    if file_format == 'parquet':
+        return pq.ParquetWriter(filename, schema), None
+    # Arrow formats CSV an order of magnitude faster than DataFrame.to_csv; the header is
+    # written by hand because Arrow always quotes it
+    target = open(filename, 'wb')
+    target.write((','.join(schema.names) + '\n').encode())
+    writer = pa_csv.CSVWriter(target, schema, write_options=pa_csv.WriteOptions(include_header=False,
+                                                                                 quoting_style='none'))
+    return writer, target
+
+
+def write_chunks(chunks, filename, file_format=None):
+    """Streams DataFrame chunks to CSV or Parquet and returns summary statistics"""
+    file_format = file_format or ('parquet' if filename.endswith(('.parquet', '.pq')) else 'csv')
+    try:
+        import pyarrow as pa
+    except ImportError:
+        if file_format == 'parquet':
+            raise
+        pa = None
+
+    stats = {'total_rows': 0, 'pass_count': 0, 'start_date': None, 'end_date': None,
+             'min': {}, 'max': {}}
+    writer = target = None
+    try:
+        for i, chunk in enumerate(chunks):
+            if pa is not None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer, target = _open_writer(filename, file_format, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(filename, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+            stats['total_rows'] += len(chunk)
+            stats['pass_count'] += int((chunk['quality'] == 'pass').sum())
+            stats['start_date'] = stats['start_date'] or chunk['timestamp'].iloc[0]
+            stats['end_date'] = chunk['timestamp'].iloc[-1]
+            for sensor in SENSORS:
+                low, high = chunk[sensor].min(), chunk[sensor].max()
+                stats['min'][sensor] = min(stats['min'].get(sensor, low), low)
+                stats['max'][sensor] = max(stats['max'].get(sensor, high), high)
+    finally:
+        if writer is not None:
+            writer.close()
+        if target is not None:
+            target.close()
+    return stats
+
+
+def print_summary(stats, filename):
+    """Show statistics collected by write_chunks"""
+    total_rows = stats['total_rows']
+    pass_count = stats['pass_count']
+    fail_count = total_rows - pass_count
+    actual_pass_rate = (pass_count / total_rows) * 100 if total_rows else 0.0
+
+    print(f"\n✅ Dataset Generation Complete!")
+    print("=" * 50)
+    print(f"📄 File: {filename}")
+    print(f"📊 Total Rows: {total_rows:,}")
+    print(f"✅ Pass Count: {pass_count:,} ({actual_pass_rate:.1f}%)")
+    print(f"❌ Fail Count: {fail_count:,} ({100-actual_pass_rate:.1f}%)")
+    print(f"📅 Date Range: {stats['start_date']} to {stats['end_date']}")
+
+    if total_rows:
+        print(f"\n🔧 Sensor Value Ranges:")
+        print(f"🌡️  Temperature: {stats['min']['temperature']:.1f}°C - {stats['max']['temperature']:.1f}°C")
+        print(f"⚡ Pressure: {stats['min']['pressure']:.2f} - {stats['max']['pressure']:.2f}")
+        print(f"📳 Vibration: {stats['min']['vibration']:.2f} - {stats['max']['vibration']:.2f}")
+        print(f"⚙️  Speed: {stats['min']['speed']:,} - {stats['max']['speed']:,} RPM")
+
+def merge_stats(shard_stats):
+    """Combine write_chunks statistics of several shards"""
+    stats = {'total_rows': 0, 'pass_count': 0, 'start_date': None, 'end_date': None,
+             'min': {}, 'max': {}}
+    for shard in shard_stats:
+        if not shard['total_rows']:
+            continue
+        stats['total_rows'] += shard['total_rows']
+        stats['pass_count'] += shard['pass_count']
+        stats['start_date'] = min(filter(None, [stats['start_date'], shard['start_date']]))
+        stats['end_date'] = max(filter(None, [stats['end_date'], shard['end_date']]))
+        for sensor in SENSORS:
+            stats['min'][sensor] = min(stats['min'].get(sensor, shard['min'][sensor]), shard['min'][sensor])
+            stats['max'][sensor] = max(stats['max'].get(sensor, shard['max'][sensor]), shard['max'][sensor])
+    return stats
+
+
+def shard_path(filename, index, workers):
+    """Output file of one worker: data.csv -> data-part-00001-of-00004.csv"""
+    if workers == 1:
+        return filename
+    stem, extension = os.path.splitext(filename)
+    return f"{stem}-part-{index:05d}-of-{workers:05d}{extension}"
+
+
+def _write_shard(task):
+    path, file_format, rows, days, pass_rate, chunk_size, seed, end_date, days_range, first_index, layout = task
+    chunks = generate_chunks(rows, days, pass_rate, chunk_size=chunk_size, seed=seed, end_date=end_date,
+                             days_range=days_range, first_index=first_index, layout=layout)
+    return write_chunks(chunks, path, file_format)
+
+
+def generate_dataset(num_rows, time_span_days, target_pass_rate, filename, file_format=None, seed=42,
+                     workers=1, chunk_size=DEFAULT_CHUNK_SIZE, end_date=None, profile=None):
+    """Generate a dataset with the vectorized generator, split over worker processes
+
+    Each worker owns an equal slice of the time span and writes its own shard
+    with an independent random stream spawned from SeedSequence(seed), so the
+    output only depends on the seed, the worker count and end_date. Shards are
+    sorted by timestamp; neighbouring shards overlap by at most 25 hours.
+    profile (see resolve_profile) selects the columns beyond the standard ones.
+    Returns the merged statistics and the shard paths.
+    """
+    end_date = end_date or datetime.now()
+    layout = build_layout(profile, seed) if profile is not None else None
+    root = np.random.SeedSequence(seed)
+    shard_seeds = root.spawn(workers)
+    shard_rows = np.random.default_rng(root).multinomial(num_rows, [1.0 / workers] * workers)
+    first_indexes = np.concatenate([[0], np.cumsum(shard_rows)[:-1]])
+    shard_days = time_span_days / workers
+
+    tasks = [
+        (shard_path(filename, i, workers), file_format, int(shard_rows[i]), time_span_days, target_pass_rate,
+         chunk_size, shard_seeds[i], end_date, (i * shard_days, (i + 1) * shard_days), int(first_indexes[i]),
+         layout)
+        for i in range(workers)
+    ]
+    if workers == 1:
+        shard_stats = [_write_shard(tasks[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shard_stats = list(executor.map(_write_shard, tasks))
+    return merge_stats(shard_stats), [task[0] for task in tasks]
+
+
 def save_dataset(data, filename):
     """Save dataset to CSV and show statistics"""
     # Create DataFrame
@@ -225,8 +631,92 @@ def save_dataset(data, filename):
     
     return df
 
-def main():
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic manufacturing quality datasets. Runs interactively without arguments.")
+    parser.add_argument('--rows', type=int, required=True, help='number of rows to generate')
+    parser.add_argument('--days', type=int, help=f'time span in days (default: rows/25, at most {DEFAULT_MAX_DAYS})')
+    parser.add_argument('--pass-rate', type=float, default=80, help='target pass rate in percent (default: 80)')
+    parser.add_argument('--output', default='manufacturing_data.csv', help='output file (default: %(default)s)')
+    parser.add_argument('--format', choices=['csv', 'parquet'],
+                        help='output format (default: from the output extension)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes, each writing one shard (default: %(default)s)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='rows generated per chunk (default: %(default)s)')
+    parser.add_argument('--end-date', type=datetime.fromisoformat,
+                        help='timestamp of the end of the time span (default: now); fix it for reproducible files')
+    parser.add_argument('--overwrite', action='store_true', help='replace existing output files')
+
+    stress = parser.add_argument_group('stress-test profiles', 'the options below override the profile defaults')
+    stress.add_argument('--profile', choices=list(GENERATOR_PROFILES), default='standard',
+                        help='column layout (default: %(default)s)')
+    stress.add_argument('--sensors', type=int, help='extra correlated sensor columns')
+    stress.add_argument('--latent-factors', type=int, help='hidden factors shared by the extra sensors')
+    stress.add_argument('--sparsity', type=float, help='share of extra sensor readings that are 0')
+    stress.add_argument('--missing-rate', type=float, help='share of extra values left empty')
+    stress.add_argument('--categoricals', type=parse_categoricals,
+                        help='categorical columns as name:cardinality pairs, e.g. machine_id:500,shift:3')
+    stress.add_argument('--drift', type=float, help='sensor mean shift over the time span, in standard deviations')
+    args = parser.parse_args(argv)
+
+    if args.rows < 1:
+        parser.error('--rows must be at least 1')
+    if args.days is None:
+        args.days = min(max(1, args.rows // 25), DEFAULT_MAX_DAYS)
+    if args.days < 1:
+        parser.error('--days must be at least 1')
+    if args.days >= ((args.end_date or datetime.now()) - datetime.min).days:
+        parser.error('--days reaches back before year 1, use a shorter span or a later --end-date')
+    if not 0 <= args.pass_rate <= 100:
+        parser.error('--pass-rate must be between 0 and 100')
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error('--workers and --chunk-size must be at least 1')
+    for option in ('sparsity', 'missing_rate'):
+        value = getattr(args, option)
+        if value is not None and not 0 <= value <= 1:
+            parser.error(f"--{option.replace('_', '-')} must be between 0 and 1")
+    if (args.sensors or 0) < 0 or (args.latent_factors or 0) < 0:
+        parser.error('--sensors and --latent-factors cannot be negative')
+    return args
+
+
+def parse_categoricals(value):
+    categoricals = {}
+    for item in filter(None, value.split(',')):
+        name, _, cardinality = item.partition(':')
+        if not name or not cardinality.isdigit() or int(cardinality) < 1:
+            raise argparse.ArgumentTypeError(f"expected name:cardinality, got '{item}'")
+        categoricals[name] = int(cardinality)
+    return categoricals
+
+
+def run_cli(argv):
+    """Non-interactive generation for scripts and CI"""
+    args = parse_args(argv)
+    paths = [shard_path(args.output, i, args.workers) for i in range(args.workers)]
+    existing = [path for path in paths if os.path.exists(path)]
+    if existing and not args.overwrite:
+        print(f"❌ {existing[0]} exists, pass --overwrite to replace it", file=sys.stderr)
+        return 1
+
+    profile = resolve_profile(args.profile, sensors=args.sensors, latent_factors=args.latent_factors,
+                              sparsity=args.sparsity, missing_rate=args.missing_rate,
+                              categoricals=args.categoricals, drift=args.drift)
+    print(f"🔧 Generating {args.rows:,} rows over {args.days} days with {args.workers} worker(s)...")
+    stats, paths = generate_dataset(args.rows, args.days, args.pass_rate, args.output, args.format, args.seed,
+                                    args.workers, args.chunk_size, args.end_date, profile)
+    print_summary(stats, ', '.join(paths) if len(paths) <= 4 else f"{paths[0]} ... {paths[-1]}")
+    return 0
+
+
+def main(argv=None):
     """Main function"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return run_cli(argv)
+
     try:
         # Get user input
         rows, days, pass_rate, filename = get_user_input()
@@ -238,11 +728,17 @@ def main():
                 print("❌ Operation cancelled.")
                 return
         
-        # Generate dataset
-        data = generate_realistic_data(rows, days, pass_rate)
-        
-        # Save and display results
-        df = save_dataset(data, filename)
+        if rows >= VECTORIZED_MIN_ROWS:
+            # Large datasets are generated in vectorized chunks and streamed to disk
+            print(f"\n🔧 Generating {rows} rows over {days} days in chunks of {DEFAULT_CHUNK_SIZE:,}...")
+            stats, _ = generate_dataset(rows, days, pass_rate, filename)
+            print_summary(stats, filename)
+        else:
+            # Generate dataset
+            data = generate_realistic_data(rows, days, pass_rate)
+            
+            # Save and display results
+            df = save_dataset(data, filename)
         
         print(f"\n🚀 Ready to use with IntelliInspect!")
         print(f"   Upload '{filename}' to the web app and start your demo!")
@@ -253,4 +749,4 @@ def main():
         print(f"\n❌ Error: {e}")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Micro-batching of concurrent single-row predictions.
+Requests for the same model that arrive within a few milliseconds are scored
+together in one vectorized call on a worker thread, and every caller gets its
+own result back.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import PREDICT_BATCH_ROWS, STAGE_SECONDS
+from predictor import CompiledPredictor
+
+
+class _Batch:
+    def __init__(self, predictor: CompiledPredictor, threshold: Optional[float]):
+        self.predictor = predictor
+        self.threshold = threshold
+        self.rows: List[Dict[str, Any]] = []
+        self.futures: List[asyncio.Future] = []
+        self.timer = None
+
+
+class MicroBatcher:
+    """Coalesces predict_row calls per model_id and threshold for up to max_wait seconds or max_size rows"""
+
+    def __init__(self, executor: Executor, max_wait: float = 0.002, max_size: int = 64):
+        self.executor = executor
+        self.max_wait = max_wait
+        self.max_size = max(1, max_size)
+        # Only touched from the event loop thread, so no locking is needed
+        self._pending: Dict[Tuple[str, Optional[float]], _Batch] = {}
+        self._tasks = set()
+
+    async def predict(self, model_id: str, predictor: CompiledPredictor, row: Dict[str, Any],
+                      threshold: Optional[float] = None) -> Tuple[int, float]:
+        loop = asyncio.get_running_loop()
+        key = (model_id, threshold)
+        batch = self._pending.get(key)
+        if batch is None or batch.predictor is not predictor:
+            if batch is not None:
+                # The model was reloaded; score what was queued against the previous instance
+                self._flush(key, batch)
+            batch = self._pending[key] = _Batch(predictor, threshold)
+            batch.timer = loop.call_later(self.max_wait, self._flush, key, batch)
+
+        future = loop.create_future()
+        batch.rows.append(row)
+        batch.futures.append(future)
+        if len(batch.rows) >= self.max_size:
+            self._flush(key, batch)
+        return await future
+
+    def _flush(self, key: Tuple[str, Optional[float]], batch: _Batch):
+        batch.timer.cancel()
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        task = asyncio.get_running_loop().create_task(self._score(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _score(self, batch: _Batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self._predict_rows, batch)
+        except Exception as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, (prediction, confidence, error) in zip(batch.futures, results):
+            if future.done():
+                # The caller went away (e.g. the client disconnected)
+                continue
+            if error is not None:
+                future.set_exception(ValueError(error))
+            else:
+                future.set_result((prediction, confidence))
+
+    @staticmethod
+    def _predict_rows(batch: _Batch):
+        start = time.perf_counter()
+        results = batch.predictor.predict_rows(batch.rows, batch.threshold)
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage='predict')
+        PREDICT_BATCH_ROWS.observe(len(batch.rows))
+        return results
@@ -0,0 +1,33 @@
+"""
+Helpers shared by the benchmark scripts. Only depends on the standard library at
+import time, so startup measurements are not skewed by importing it.
+"""
+
+import os
+import sys
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DATASET = os.path.join(SERVICE_DIR, '..', 'dataset', 'manufacturing_quality_700_rows.csv')
+
+
+def proc_status_mb(field, pid='self'):
+    # VmHWM is reset on exec, unlike ru_maxrss which Linux carries over from the parent
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def train_model():
+    """Fits the demo dataset into the registry under MODEL_DIR; returns the model id and
+    the feature rows (timestamp and target dropped) as a DataFrame"""
+    sys.path.insert(0, SERVICE_DIR)
+    import pandas as pd
+    import main
+    import training
+
+    df = pd.read_csv(DATASET)
+    result = training.train_model(main.model_registry, 'bench', [df.iloc[:560], df.iloc[560:]],
+                                  main.TrainingOptions(use_cache=False))
+    return result.model_id, df.drop(columns=['timestamp', 'quality'])
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Concurrent /predict load benchmark with and without micro-batching.
+Drives the app in-process through an ASGI client at a fixed offered rate and
+reports achieved throughput and latency percentiles for each mode.
+
+Usage: python benchmarks/bench_batching.py [--rate 1000] [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DATASET = os.path.join(SERVICE_DIR, '..', 'dataset', 'manufacturing_quality_700_rows.csv')
+
+
+async def drive(app, model_id, rows, rate, total):
+    # Open-loop load: request i is due at start + i / rate and its latency counts from
+    # that moment, so time spent waiting for a blocked event loop is included
+    import httpx
+    import numpy as np
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        async def call(i, due):
+            response = await client.post('/predict', json={'model_id': model_id, 'data': rows[i % len(rows)]})
+            latencies.append(time.perf_counter() - due)
+            response.raise_for_status()
+
+        await asyncio.gather(*(call(i, time.perf_counter()) for i in range(20)))  # warm-up
+        latencies.clear()
+        tasks = []
+        start = time.perf_counter()
+        for i in range(total):
+            due = start + i / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(call(i, due)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    latencies_ms = np.asarray(latencies) * 1000
+    return {'requests_per_second': total / elapsed, 'p50_ms': float(np.percentile(latencies_ms, 50)),
+            'p99_ms': float(np.percentile(latencies_ms, 99))}
+
+
+def run_mode(args):
+    sys.path.insert(0, SERVICE_DIR)
+    import pandas as pd
+    import main
+    import training
+
+    df = pd.read_csv(DATASET)
+    # A deeper forest than the demo default so per-call inference cost is visible
+    options = main.TrainingOptions(training_profile='custom', use_cache=False,
+                                   training_params={'num_boost_round': args.rounds, 'max_depth': 6})
+    result = training.train_model(main.model_registry, 'bench', [df.iloc[:560], df.iloc[560:]], options)
+    rows = df.drop(columns=['timestamp', 'quality']).to_dict('records')
+    stats = asyncio.run(drive(main.app, result.model_id, rows, args.rate, args.requests))
+    print(json.dumps(stats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rate', type=float, default=1000, help='offered load in requests per second')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=300, help='boosting rounds of the benchmark model')
+    parser.add_argument('--max-wait-ms', default='2')
+    parser.add_argument('--max-size', default='64')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args)
+        return
+
+    print(f"{args.requests:,} /predict calls offered at {args.rate:,.0f} requests/s")
+    print(f"{'mode':>10} | {'req/s':>8} | {'p50 ms':>7} | {'p99 ms':>7}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode, enabled in (('unbatched', '0'), ('batched', '1')):
+            env = dict(os.environ, MODEL_DIR=workdir, LOG_LEVEL='WARNING', PREDICT_BATCHING=enabled,
+                       PREDICT_BATCH_MAX_WAIT_MS=args.max_wait_ms, PREDICT_BATCH_MAX_SIZE=args.max_size)
+            command = [sys.executable, __file__, '--child', '--rate', str(args.rate),
+                       '--requests', str(args.requests), '--rounds', str(args.rounds)]
+            output = subprocess.run(command, check=True, capture_output=True, text=True, env=env).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:>10} | {stats['requests_per_second']:8.0f} | {stats['p50_ms']:7.2f} | {stats['p99_ms']:7.2f}")
+
+
+if __name__ == '__main__':
+    main()
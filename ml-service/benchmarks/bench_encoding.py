@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Categorical encoding benchmark.
+Compares the previous LabelEncoder + per-element unseen-value lambda with the
+vectorized CategoricalEncoder, and checks that both produce the same codes.
+
+Usage: python benchmarks/bench_encoding.py [--rows 1000000] [--columns 10] [--cardinality 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from encoding import CategoricalEncoder  # noqa: E402
+
+
+def legacy_encode(train_values, test_values):
+    # Mirrors the original train_model / predict implementation
+    le = LabelEncoder()
+    train_codes = le.fit_transform(train_values.astype(str))
+    test_values = test_values.astype(str)
+    seen_values = set(le.classes_)
+    most_common_value = le.classes_[0]
+    test_values_handled = test_values.apply(lambda x: x if x in seen_values else most_common_value)
+    return train_codes, le.transform(test_values_handled)
+
+
+def vectorized_encode(train_values, test_values):
+    encoder = CategoricalEncoder()
+    return encoder.fit_transform(train_values), encoder.transform(test_values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--columns', type=int, default=10)
+    parser.add_argument('--cardinality', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    train_rows = int(args.rows * 0.8)
+    columns = []
+    for _ in range(args.columns):
+        values = pd.Series(np.char.add('M', rng.integers(0, args.cardinality, args.rows).astype(str)), dtype=object)
+        # Roughly 1% of test values are categories never seen during training
+        test = values.iloc[train_rows:].copy()
+        unseen = rng.random(len(test)) < 0.01
+        test[unseen] = 'unseen'
+        columns.append((values.iloc[:train_rows], test))
+
+    timings = {}
+    for name, encode in (('legacy', legacy_encode), ('vectorized', vectorized_encode)):
+        start = time.perf_counter()
+        results = [encode(train, test) for train, test in columns]
+        timings[name] = time.perf_counter() - start
+        if name == 'legacy':
+            expected = results
+        else:
+            for (expected_train, expected_test), (train_codes, test_codes) in zip(expected, results):
+                assert np.array_equal(expected_train, train_codes) and np.array_equal(expected_test, test_codes)
+
+    print(f"Encoding {args.columns} columns x {args.rows:,} rows (cardinality {args.cardinality}, 80/20 split)")
+    for name, seconds in timings.items():
+        print(f"{name:>10}: {seconds:8.2f} s")
+    print(f"   speedup: {timings['legacy'] / timings['vectorized']:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
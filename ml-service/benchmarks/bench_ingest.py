@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Training ingest memory benchmark.
+Compares peak RSS and wall time of the JSON list-of-dicts /train payload with
+the column-oriented /train/upload formats, up to the DataFrame handed to training.
+
+Usage: python benchmarks/bench_ingest.py [--rows 100000] [--columns 100]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import SERVICE_DIR, proc_status_mb
+
+
+def run_mode(mode, path):
+    # Runs in a fresh interpreter so ru_maxrss only reflects this mode
+    sys.path.insert(0, SERVICE_DIR)
+    import pandas as pd
+    from ingest import read_table
+    from main import TrainingRequest
+
+    baseline = proc_status_mb('VmRSS')
+    start = time.perf_counter()
+    if mode == 'json':
+        with open(path, 'rb') as f:
+            payload = json.loads(f.read())
+        request = TrainingRequest(**payload)
+        del payload
+        df = pd.DataFrame(request.training_data)
+    else:
+        df = read_table(path, mode)
+    elapsed = time.perf_counter() - start
+    peak = proc_status_mb('VmHWM')
+    print(json.dumps({'mode': mode, 'rows': len(df), 'columns': df.shape[1], 'seconds': elapsed,
+                      'baseline_rss_mb': baseline, 'peak_rss_mb': peak,
+                      'frame_mb': df.memory_usage(deep=True).sum() / 1024 ** 2}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--columns', type=int, default=100)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.path)
+        return
+
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(rng.normal(size=(args.rows, args.columns)).astype(np.float64),
+                      columns=[f'sensor_{i}' for i in range(args.columns)])
+    df['quality'] = np.where(rng.random(args.rows) < 0.8, 'pass', 'fail')
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = {
+            'json': os.path.join(workdir, 'payload.json'),
+            'parquet': os.path.join(workdir, 'train.parquet'),
+            'arrow': os.path.join(workdir, 'train.arrow'),
+            'csv': os.path.join(workdir, 'train.csv'),
+        }
+        with open(paths['json'], 'w') as f:
+            json.dump({'dataset_id': 'bench', 'training_data': df.to_dict('records'), 'testing_data': []}, f)
+        df.to_parquet(paths['parquet'])
+        df.to_feather(paths['arrow'])
+        df.to_csv(paths['csv'], index=False)
+        del df
+
+        print(f"Ingest of {args.rows:,} rows x {args.columns + 1} columns")
+        print(f"{'mode':>8} | {'payload MB':>10} | {'seconds':>8} | {'peak RSS over baseline MB':>26}")
+        env = dict(os.environ, MODEL_DIR=os.path.join(workdir, 'models'))
+        for mode, path in paths.items():
+            output = subprocess.run([sys.executable, __file__, '--mode', mode, '--path', path],
+                                    check=True, capture_output=True, text=True, env=env).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:>8} | {os.path.getsize(path) / 1024 ** 2:10.1f} | {result['seconds']:8.2f} | "
+                  f"{result['peak_rss_mb'] - result['baseline_rss_mb']:26.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Single-row inference micro-benchmark.
+Compares the legacy DataFrame-based /predict path with the compiled predictor.
+
+Usage: python benchmarks/bench_predict.py [--iterations 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from encoding import CategoricalEncoder  # noqa: E402
+from predictor import CompiledPredictor, to_binary_prediction  # noqa: E402
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'dataset',
+                       'manufacturing_quality_700_rows.csv')
+
+
+def load_data():
+    df = pd.read_csv(DATASET)
+    # Add a categorical column so the encoder path is exercised too
+    df['line'] = np.array(['L1', 'L2', 'L3', 'L4'])[np.arange(len(df)) % 4]
+    return df
+
+
+def train(df):
+    feature_columns = ['temperature', 'pressure', 'vibration', 'speed', 'line']
+    X = df[feature_columns].copy()
+    line_encoder = LabelEncoder()
+    X['line'] = line_encoder.fit_transform(X['line'].astype(str))
+    target_encoder = LabelEncoder()
+    y = target_encoder.fit_transform(df['quality'].astype(str))
+    model = xgb.XGBClassifier(random_state=42, eval_metric='logloss', max_depth=3,
+                              n_estimators=50, learning_rate=0.1)
+    model.fit(X, y)
+    return model, feature_columns, {'line': line_encoder}, target_encoder
+
+
+def compile_predictor(model, feature_columns, label_encoders, target_encoder):
+    encoders = {col: CategoricalEncoder(le.classes_) for col, le in label_encoders.items()}
+    # Class labels as training stores them: the target encoder's classes
+    return CompiledPredictor(model.get_booster(), feature_columns, encoders, target_encoder.classes_.tolist())
+
+
+def check_float_target(df, feature_columns, label_encoders):
+    # A 0/1 target that pandas holds as float (e.g. JSON rows with a missing label) keeps its
+    # labels as floats in training; 1.0 must still predict pass like the legacy class index did
+    X = df[feature_columns].copy()
+    X['line'] = label_encoders['line'].transform(X['line'].astype(str))
+    y = (df['quality'] == 'pass').astype(float)
+    model = xgb.XGBClassifier(random_state=42, eval_metric='logloss', max_depth=3,
+                              n_estimators=50, learning_rate=0.1)
+    model.fit(X, y)
+    encoders = {col: CategoricalEncoder(le.classes_) for col, le in label_encoders.items()}
+    predictor = CompiledPredictor(model.get_booster(), feature_columns, encoders, np.unique(y).tolist())
+    rows = df[feature_columns].to_dict('records')
+    actual = np.array([predictor.predict_row(row)[0] for row in rows])
+    expected = np.array([to_binary_prediction(label) for label in model.predict(X)])
+    assert (actual == expected).all(), f"float 0/1 target: {actual.sum()} passes predicted, expected {expected.sum()}"
+
+
+def legacy_predict(model, feature_columns, label_encoders, target_encoder, data):
+    # Mirrors the original /predict implementation
+    input_df = pd.DataFrame([data])[feature_columns]
+    for col, le in label_encoders.items():
+        input_values = input_df[col].astype(str)
+        seen_values = set(le.classes_)
+        most_common_value = le.classes_[0]
+        input_values_handled = input_values.apply(lambda x: x if x in seen_values else most_common_value)
+        input_df[col] = le.transform(input_values_handled)
+    prediction = model.predict(input_df)[0]
+    confidence = float(max(model.predict_proba(input_df)[0]))
+    if target_encoder:
+        prediction = target_encoder.inverse_transform([prediction])[0]
+    return to_binary_prediction(prediction), confidence
+
+
+def time_calls(fn, rows, iterations):
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        row = rows[i % len(rows)]
+        start = time.perf_counter()
+        fn(row)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def report(name, timings):
+    print(f"{name:>10}: p50 {np.percentile(timings, 50):9.1f} us | p99 {np.percentile(timings, 99):9.1f} us"
+          f" | mean {timings.mean():9.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+
+    df = load_data()
+    model, feature_columns, label_encoders, target_encoder = train(df)
+    predictor = compile_predictor(model, feature_columns, label_encoders, target_encoder)
+    rows = df[feature_columns].to_dict('records')
+
+    # Both paths must agree before timing them
+    for row in rows:
+        expected = legacy_predict(model, feature_columns, label_encoders, target_encoder, row)
+        actual = predictor.predict_row(row)
+        assert expected[0] == actual[0] and abs(expected[1] - actual[1]) < 1e-6, (row, expected, actual)
+    check_float_target(df, feature_columns, label_encoders)
+
+    legacy_iterations = max(1, args.iterations // 10)
+    print(f"Single-row predict latency ({len(feature_columns)} features, model time only)")
+    report('legacy', time_calls(
+        lambda row: legacy_predict(model, feature_columns, label_encoders, target_encoder, row),
+        rows, legacy_iterations))
+    report('compiled', time_calls(predictor.predict_row, rows, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
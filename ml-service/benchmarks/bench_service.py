@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+End-to-end ml-service benchmark.
+Generates synthetic datasets with dataset/dataset_generator.py, calls the FastAPI
+app in-process and records training wall time, peak RSS, single-row /predict
+p50/p99 and /predict/batch throughput per dataset size. Results are written to
+a JSON file so runs can be compared.
+
+Usage: python benchmarks/bench_service.py [--scenarios 1000x4,100000x50] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from _common import proc_status_mb
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.join(BENCH_DIR, '..')
+DATASET_DIR = os.path.join(BENCH_DIR, '..', '..', 'dataset')
+
+DEFAULT_SCENARIOS = '1000x4,100000x4,1000000x4,100000x100,20000x2000'
+BASE_SENSORS = ['temperature', 'pressure', 'vibration', 'speed']
+
+
+def reset_peak_rss():
+    # Writing 5 to clear_refs resets VmHWM (Linux 4.0+), so dataset generation is not counted
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def build_dataset(rows, columns, seed):
+    import pandas as pd
+
+    sys.path.insert(0, DATASET_DIR)
+    from dataset_generator import build_layout, generate_chunks, resolve_profile
+
+    # Columns beyond the four base sensors are correlated extra sensors from the generator
+    layout = build_layout(resolve_profile(sensors=max(0, columns - len(BASE_SENSORS))), seed)
+    df = pd.concat(generate_chunks(rows, max(1, rows // 25), 80, seed=seed, layout=layout), ignore_index=True)
+    # Timestamps go over the wire as strings, the way the backend sends them
+    df['timestamp'] = df['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    return df.drop(columns=BASE_SENSORS[columns:])
+
+
+def percentile_ms(samples, q):
+    import numpy as np
+
+    return float(np.percentile(np.asarray(samples) * 1000, q))
+
+
+def run_scenario(rows, columns, args):
+    # Runs in a fresh interpreter so the peak RSS only reflects this scenario
+    sys.path.insert(0, SERVICE_DIR)
+    from fastapi.testclient import TestClient
+    import main
+
+    df = build_dataset(rows, columns, args.seed)
+    split = int(len(df) * 0.8)
+    records = df.to_dict('records')
+    payload = {'dataset_id': f'bench-{rows}x{columns}', 'training_data': records[:split],
+               'testing_data': records[split:], 'training_profile': args.profile}
+    feature_columns = [col for col in df.columns if col not in ('timestamp', 'quality')]
+    holdout = df.iloc[split:]
+    del df
+
+    client = TestClient(main.app)
+    peak_reset = reset_peak_rss()
+    baseline = proc_status_mb('VmRSS')
+
+    start = time.perf_counter()
+    job = client.post('/train', json=payload).json()
+    del payload
+    while True:
+        status = client.get(f"/train/{job['job_id']}").json()
+        if status['status'] in ('completed', 'failed'):
+            break
+        time.sleep(0.05)
+    train_seconds = time.perf_counter() - start
+    peak = proc_status_mb('VmHWM')
+    if status['status'] == 'failed':
+        raise RuntimeError(status['error'])
+    result = status['result']
+    model_id = result['model_id']
+
+    # Single-row latency through the full HTTP stack
+    single_rows = holdout[feature_columns].head(args.predict_requests).to_dict('records')
+    for row in single_rows[:20]:
+        client.post('/predict', json={'model_id': model_id, 'data': row})
+    latencies = []
+    for row in single_rows:
+        start = time.perf_counter()
+        response = client.post('/predict', json={'model_id': model_id, 'data': row})
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    # Columnar batch throughput
+    batch = holdout[feature_columns].head(args.batch_rows)
+    columns_payload = {col: batch[col].tolist() for col in feature_columns}
+    batch_seconds = []
+    for _ in range(args.batch_repeats):
+        start = time.perf_counter()
+        response = client.post('/predict/batch', json={'model_id': model_id, 'columns': columns_payload})
+        batch_seconds.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    return {
+        'rows': rows,
+        'feature_columns': len(feature_columns),
+        'training_profile': args.profile,
+        'train_seconds': train_seconds,
+        'fit_seconds': result['fit_time_seconds'],
+        'num_boost_rounds': result['num_boost_rounds'],
+        'accuracy': result['accuracy'],
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': peak,
+        'peak_rss_includes_generation': not peak_reset,
+        'predict_p50_ms': percentile_ms(latencies, 50),
+        'predict_p99_ms': percentile_ms(latencies, 99),
+        'batch_rows': len(batch),
+        'batch_rows_per_second': len(batch) / min(batch_seconds),
+    }
+
+
+def parse_scenarios(value):
+    scenarios = []
+    for item in value.split(','):
+        rows, columns = item.lower().split('x')
+        scenarios.append((int(rows), int(columns)))
+    return scenarios
+
+
+def environment_info():
+    import numpy as np
+    import pandas as pd
+    import xgboost as xgb
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'timestamp': datetime.now().isoformat(), 'git_commit': commit, 'python': platform.python_version(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'xgboost': xgb.__version__,
+            'platform': platform.platform(), 'cpu_count': os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', default=DEFAULT_SCENARIOS,
+                        help='comma-separated ROWSxCOLUMNS list, columns are feature columns')
+    parser.add_argument('--profile', default='small', choices=['small', 'large'])
+    parser.add_argument('--predict-requests', type=int, default=500)
+    parser.add_argument('--batch-rows', type=int, default=10000)
+    parser.add_argument('--batch-repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results.json'))
+    parser.add_argument('--scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        rows, columns = parse_scenarios(args.scenario)[0]
+        print(json.dumps(run_scenario(rows, columns, args)))
+        return
+
+    report = {'environment': environment_info(), 'results': []}
+    print(f"{'rows':>9} | {'cols':>5} | {'train s':>8} | {'peak RSS MB':>11} | "
+          f"{'p50 ms':>7} | {'p99 ms':>7} | {'batch rows/s':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, MODEL_DIR=os.path.join(workdir, 'models'), LOG_LEVEL='WARNING')
+        for rows, columns in parse_scenarios(args.scenarios):
+            command = [sys.executable, __file__, '--scenario', f'{rows}x{columns}', '--profile', args.profile,
+                       '--predict-requests', str(args.predict_requests), '--batch-rows', str(args.batch_rows),
+                       '--batch-repeats', str(args.batch_repeats), '--seed', str(args.seed)]
+            output = subprocess.run(command, check=True, capture_output=True, text=True, env=env).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            report['results'].append(result)
+            print(f"{rows:9d} | {result['feature_columns']:5d} | {result['train_seconds']:8.2f} | "
+                  f"{result['peak_rss_mb'] - result['baseline_rss_mb']:11.1f} | {result['predict_p50_ms']:7.2f} | "
+                  f"{result['predict_p99_ms']:7.2f} | {result['batch_rows_per_second']:12.0f}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Simulation scoring benchmark: one /predict call per row vs the streaming /simulate endpoint.
+Starts a uvicorn server and reports rows per second for both, plus the time until the
+first /simulate line arrives.
+
+Usage: python benchmarks/bench_simulation.py [--rows 100000] [--chunk-size 1000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import SERVICE_DIR, train_model
+
+
+def wait_until_healthy(client, server):
+    while True:
+        try:
+            client.get('/health').raise_for_status()
+            return
+        except Exception:
+            if server.poll() is not None:
+                raise RuntimeError('uvicorn exited before becoming healthy')
+            time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='rows in the simulation batch')
+    parser.add_argument('--predict-rows', type=int, default=5000, help='rows sent one by one to /predict')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    import httpx
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ.update(MODEL_DIR=workdir, LOG_LEVEL='WARNING')
+        model_id, features = train_model()
+        dataset_rows = features.to_dict('records')
+        rows = [dataset_rows[i % len(dataset_rows)] for i in range(args.rows)]
+
+        server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(args.port)],
+                                  cwd=SERVICE_DIR, env=dict(os.environ), stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+        try:
+            with httpx.Client(base_url=f'http://127.0.0.1:{args.port}', timeout=600) as client:
+                wait_until_healthy(client, server)
+                client.post('/predict', json={'model_id': model_id, 'data': rows[0]}).raise_for_status()
+
+                start = time.perf_counter()
+                for row in rows[:args.predict_rows]:
+                    client.post('/predict', json={'model_id': model_id, 'data': row}).raise_for_status()
+                per_row_rate = args.predict_rows / (time.perf_counter() - start)
+
+                start = time.perf_counter()
+                first_line = None
+                with client.stream('POST', '/simulate', json={'model_id': model_id, 'rows': rows,
+                                                              'chunk_size': args.chunk_size}) as response:
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        if first_line is None:
+                            first_line = time.perf_counter() - start
+                summary = json.loads(line)
+                elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'path':>10} | {'rows':>8} | {'rows/s':>9} | {'first result s':>14}")
+    print(f"{'/predict':>10} | {args.predict_rows:8,} | {per_row_rate:9,.0f} | {'-':>14}")
+    print(f"{'/simulate':>10} | {summary['processed']:8,} | {summary['processed'] / elapsed:9,.0f} | {first_line:14.2f}")
+
+
+if __name__ == '__main__':
+    main()
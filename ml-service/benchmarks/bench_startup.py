@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for the full and inference-only service modes.
+For each ML_SERVICE_MODE it measures, in fresh interpreters, the time and RSS to
+import the app, the first /predict (which loads XGBoost and the model), and the
+time until a uvicorn server answers /health.
+
+Usage: python benchmarks/bench_startup.py [--repeats 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from _common import SERVICE_DIR, proc_status_mb, train_model
+
+TRAINING_MODULES = ('pandas', 'sklearn', 'pyarrow')
+
+
+def measure_import(model_id, row):
+    sys.path.insert(0, SERVICE_DIR)
+    start = time.perf_counter()
+    import main
+    import_seconds = time.perf_counter() - start
+    import_rss = proc_status_mb('VmRSS')
+
+    from fastapi.testclient import TestClient
+    client = TestClient(main.app)
+    start = time.perf_counter()
+    client.post('/predict', json={'model_id': model_id, 'data': row}).raise_for_status()
+    first_predict_seconds = time.perf_counter() - start
+    print(json.dumps({'import_seconds': import_seconds, 'import_rss_mb': import_rss,
+                      'first_predict_seconds': first_predict_seconds, 'predict_rss_mb': proc_status_mb('VmRSS'),
+                      'training_modules': [name for name in TRAINING_MODULES if sys.modules.get(name)]}))
+
+
+def measure_server(env, port):
+    # Wall time from spawning uvicorn until /health answers, and the worker's RSS at that point
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port)],
+                              cwd=SERVICE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1):
+                    break
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError('uvicorn exited before becoming healthy')
+                time.sleep(0.01)
+        return time.perf_counter() - start, proc_status_mb('VmRSS', server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_child(args, env):
+    command = [sys.executable, __file__] + args
+    output = subprocess.run(command, check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--train', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.train:
+        model_id, features = train_model()
+        print(json.dumps({'model_id': model_id, 'row': features.iloc[0].to_dict()}))
+        return
+    if args.measure:
+        model = json.loads(args.measure)
+        measure_import(model['model_id'], model['row'])
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        base_env = dict(os.environ, MODEL_DIR=workdir, LOG_LEVEL='WARNING')
+        model = run_child(['--train'], base_env)
+
+        print(f"{'mode':>9} | {'import s':>8} | {'import RSS MB':>13} | {'1st predict s':>13} | "
+              f"{'RSS MB':>7} | {'server ready s':>14} | {'server RSS MB':>13} | training libs")
+        for mode in ('full', 'inference'):
+            env = dict(base_env, ML_SERVICE_MODE=mode)
+            runs = [run_child(['--measure', json.dumps(model)], env) for _ in range(args.repeats)]
+            servers = [measure_server(env, args.port) for _ in range(args.repeats)]
+            print(f"{mode:>9} | {median([r['import_seconds'] for r in runs]):8.2f} | "
+                  f"{median([r['import_rss_mb'] for r in runs]):13.1f} | "
+                  f"{median([r['first_predict_seconds'] for r in runs]):13.2f} | "
+                  f"{median([r['predict_rss_mb'] for r in runs]):7.1f} | "
+                  f"{median([ready for ready, _ in servers]):14.2f} | {median([rss for _, rss in servers]):13.1f} | "
+                  f"{', '.join(runs[0]['training_modules']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Vectorized categorical encoding shared by training and every inference path.
+Only depends on NumPy so inference-only deployments can use it as well.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+
+def as_strings(values: Iterable[Any]) -> np.ndarray:
+    # Same string conversion as pandas .astype(str) (None -> 'None', 1.0 -> '1.0')
+    return np.asarray(values, dtype=object).astype(str)
+
+
+def _is_pandas(values) -> bool:
+    # Training hands over pandas Series; inference paths pass plain lists
+    return type(values).__module__.startswith('pandas')
+
+
+class CategoricalEncoder:
+    """Maps values to the code of their sorted class; unseen values get unseen_code"""
+
+    def __init__(self, classes: Optional[Iterable[str]] = None, unseen_code: int = 0):
+        # Code 0 is the first sorted training class, which matches the previous
+        # LabelEncoder fallback of replacing unseen values with classes_[0]
+        self.classes_ = np.asarray(list(classes) if classes is not None else [], dtype=str)
+        self.unseen_code = unseen_code
+        self._mapping = None
+        self._index = None
+
+    def fit_transform(self, values: Iterable[Any]) -> np.ndarray:
+        self._mapping = None
+        self._index = None
+        if _is_pandas(values):
+            import pandas as pd
+
+            # Hash-based factorize avoids sorting every value, only the distinct ones
+            codes, uniques = pd.factorize(values.astype(str), sort=True)
+            self.classes_ = np.asarray(uniques, dtype=str)
+            return codes.astype(np.int64)
+        self.classes_, codes = np.unique(as_strings(values), return_inverse=True)
+        return codes.astype(np.int64)
+
+    def transform(self, values: Iterable[Any]) -> np.ndarray:
+        if _is_pandas(values):
+            import pandas as pd
+
+            # One hash lookup per value; -1 marks values never seen in training
+            if self._index is None:
+                self._index = pd.Index(self.classes_.astype(object))
+            codes = self._index.get_indexer(values.astype(str)).astype(np.int64)
+            codes[codes < 0] = self.unseen_code
+            return codes
+
+        strings = as_strings(values)
+        if len(self.classes_) == 0:
+            return np.full(len(strings), self.unseen_code, dtype=np.int64)
+        # classes_ is sorted, so one binary search per value finds its code
+        positions = np.searchsorted(self.classes_, strings)
+        positions[positions == len(self.classes_)] = 0
+        return np.where(self.classes_[positions] == strings, positions, self.unseen_code).astype(np.int64)
+
+    @property
+    def mapping(self) -> Dict[str, int]:
+        # Dict lookup table for scoring single values without array overhead
+        if self._mapping is None:
+            self._mapping = {value: code for code, value in enumerate(self.classes_.tolist())}
+        return self._mapping
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'classes': self.classes_.tolist(), 'unseen_code': self.unseen_code}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CategoricalEncoder':
+        return cls(data['classes'], data.get('unseen_code', 0))
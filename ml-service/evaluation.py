@@ -0,0 +1,103 @@
+"""
+Vectorized evaluation of trained models on their test split.
+Classification metrics come from one bincount confusion matrix; for binary models
+the threshold sweep, ROC/PR AUC and calibration bins all come from a single sort
+of the predicted probabilities. Only depends on NumPy.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+CALIBRATION_BINS = 10
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # 0 where the denominator is 0, like scikit-learn's zero_division=0
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+
+def classification_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, Any]:
+    """Accuracy, support-weighted precision/recall/F1 and the confusion matrix over
+    the labels present in either array, matching scikit-learn's average='weighted'"""
+    labels = np.union1d(y_true, y_pred)
+    n_labels = len(labels)
+    true_codes = np.searchsorted(labels, y_true)
+    pred_codes = np.searchsorted(labels, y_pred)
+    cm = np.bincount(true_codes * n_labels + pred_codes, minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+
+    true_positives = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    total = support.sum()
+    weights = support / total if total else np.zeros(n_labels)
+    return {
+        'accuracy': float(true_positives.sum() / total) if total else 0.0,
+        'precision': float(weights @ _divide(true_positives, predicted)),
+        'recall': float(weights @ _divide(true_positives, support)),
+        # 2PR / (P + R) per class, written in counts
+        'f1_score': float(weights @ _divide(2 * true_positives, support + predicted)),
+        'confusion_matrix': cm.tolist(),
+    }
+
+
+def binary_report(y_true: np.ndarray, scores: np.ndarray, curve_points: Optional[int] = 101,
+                  calibration_bins: int = CALIBRATION_BINS) -> Dict[str, Any]:
+    """Threshold sweep, ROC AUC, average precision (PR AUC) and calibration bins for
+    P(class 1) scores. The sweep uses the service's rule (positive when score > threshold)
+    on curve_points evenly spaced thresholds, or on every distinct score if None"""
+    scores = np.asarray(scores)
+    order = np.argsort(scores, kind='stable')
+    sorted_scores = scores[order]
+    positives_sorted = (np.asarray(y_true) == 1)[order]
+    n_rows = len(sorted_scores)
+    # Prefix sums over the ascending order; every statistic below is a difference of two entries
+    cum_positives = np.concatenate(([0], np.cumsum(positives_sorted)))
+    cum_scores = np.concatenate(([0.0], np.cumsum(sorted_scores, dtype=np.float64)))
+    n_positive = int(cum_positives[-1])
+    n_negative = n_rows - n_positive
+
+    # ROC and PR curves at every distinct score (descending), ties grouped like scikit-learn
+    group_starts = np.flatnonzero(np.r_[True, np.diff(sorted_scores) != 0])[::-1]
+    true_positives = n_positive - cum_positives[group_starts]
+    false_positives = (n_rows - group_starts) - true_positives
+    roc_auc = pr_auc = None
+    if n_positive and n_negative:
+        tpr = np.r_[0.0, true_positives / n_positive]
+        fpr = np.r_[0.0, false_positives / n_negative]
+        roc_auc = float(np.trapz(tpr, fpr))
+        precision = true_positives / (true_positives + false_positives)
+        pr_auc = float(np.sum(np.diff(np.r_[0.0, true_positives / n_positive]) * precision))
+
+    if curve_points is not None:
+        thresholds = np.arange(curve_points) / max(1, curve_points - 1)
+    else:
+        thresholds = sorted_scores[group_starts[::-1]]
+    # Rows strictly above each threshold, compared in the scores' precision like the predictor
+    cut = np.searchsorted(sorted_scores, thresholds.astype(sorted_scores.dtype), side='right')
+    predicted_positive = n_rows - cut
+    sweep_tp = n_positive - cum_positives[cut]
+    sweep_fp = predicted_positive - sweep_tp
+    sweep = {
+        'thresholds': thresholds.tolist(),
+        'precision': _divide(sweep_tp.astype(np.float64), predicted_positive).tolist(),
+        'recall': (sweep_tp / n_positive if n_positive else np.zeros(len(cut))).tolist(),
+        'false_positive_rate': (sweep_fp / n_negative if n_negative else np.zeros(len(cut))).tolist(),
+    }
+
+    # Fixed-width probability bins (lower edge exclusive, like scikit-learn's calibration_curve)
+    edges = np.arange(calibration_bins + 1) / calibration_bins
+    bounds = np.r_[0, np.searchsorted(sorted_scores, edges[1:-1].astype(sorted_scores.dtype), side='right'), n_rows]
+    calibration = []
+    for i in range(calibration_bins):
+        start, end = bounds[i], bounds[i + 1]
+        if end > start:
+            calibration.append({
+                'lower': float(edges[i]),
+                'upper': float(edges[i + 1]),
+                'count': int(end - start),
+                'mean_predicted': float((cum_scores[end] - cum_scores[start]) / (end - start)),
+                'fraction_positive': float((cum_positives[end] - cum_positives[start]) / (end - start)),
+            })
+
+    return {'roc_auc': roc_auc, 'pr_auc': pr_auc, 'threshold_sweep': sweep, 'calibration': calibration}
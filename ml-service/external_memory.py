@@ -0,0 +1,339 @@
+"""
+Out-of-core training for sensor histories larger than memory.
+Uploaded files are read in chunks: a first pass fits the encoders and finds the
+train/test boundary, XGBoost then builds an external-memory DMatrix through a
+DataIter, and the test rows are scored chunk by chunk.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import xgboost as xgb
+
+from encoding import CategoricalEncoder
+from ingest import open_ipc
+from metrics import TRAINING_CACHE
+from predictor import CompiledPredictor
+from registry import ModelRegistry
+from schemas import TrainingOptions, TrainingResponse
+from training import (detect_target_column, detect_timestamp_column, evaluate_predictions, fill_missing,
+                      parse_timestamps, resolve_training_params, select_feature_columns, split_test_size, to_csr)
+
+logger = logging.getLogger("ml_service")
+
+# Rows per chunk handed to XGBoost; memory use scales with this, not with the file size
+EXTERNAL_MEMORY_CHUNK_ROWS = int(os.environ.get("EXTERNAL_MEMORY_CHUNK_ROWS", "100000"))
+# Where XGBoost writes its page cache (defaults to the system temp directory)
+EXTERNAL_MEMORY_DIR = os.environ.get("EXTERNAL_MEMORY_DIR") or None
+
+
+def is_categorical(data_type: pa.DataType) -> bool:
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type) or pa.types.is_dictionary(data_type)
+
+
+class ChunkedTable:
+    """Reads an uploaded Parquet, Arrow IPC or CSV file as a sequence of DataFrames"""
+
+    def __init__(self, path: str, file_format: str, chunk_rows: int = EXTERNAL_MEMORY_CHUNK_ROWS):
+        self.path = path
+        self.file_format = file_format
+        self.chunk_rows = chunk_rows
+        self.schema = self._read_schema()
+
+    def _read_schema(self) -> pa.Schema:
+        if self.file_format == 'parquet':
+            import pyarrow.parquet as pq
+
+            return pq.ParquetFile(self.path).schema_arrow
+        if self.file_format == 'csv':
+            import pyarrow.csv as pa_csv
+
+            reader = pa_csv.open_csv(self.path)
+            # Types are inferred from the first block only; integers are widened so a
+            # later block with decimals still converts
+            return pa.schema([field.with_type(pa.float64()) if pa.types.is_integer(field.type) or
+                              pa.types.is_null(field.type) else field for field in reader.schema])
+        if self.file_format == 'arrow':
+            with pa.memory_map(self.path, 'r') as source:
+                return open_ipc(source).schema
+        raise ValueError(f"Unsupported format '{self.file_format}'")
+
+    def _record_batches(self, columns: List[str]) -> Iterator[pa.RecordBatch]:
+        if self.file_format == 'parquet':
+            import pyarrow.parquet as pq
+
+            yield from pq.ParquetFile(self.path).iter_batches(batch_size=self.chunk_rows, columns=columns)
+        elif self.file_format == 'csv':
+            import pyarrow.csv as pa_csv
+
+            convert_options = pa_csv.ConvertOptions(
+                include_columns=columns, column_types={name: self.schema.field(name).type for name in columns})
+            with pa_csv.open_csv(self.path, convert_options=convert_options) as reader:
+                yield from reader
+        else:
+            with pa.memory_map(self.path, 'r') as source:
+                reader = open_ipc(source)
+                if isinstance(reader, pa.ipc.RecordBatchFileReader):
+                    batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+                else:
+                    batches = reader
+                for batch in batches:
+                    yield pa.RecordBatch.from_arrays([batch.column(name) for name in columns], names=columns)
+
+    def chunks(self, columns: List[str]) -> Iterator[pd.DataFrame]:
+        for batch in self._record_batches(columns):
+            # Memory-mapped IPC batches can be arbitrarily large; slicing them is zero-copy
+            for offset in range(0, batch.num_rows, self.chunk_rows):
+                yield batch.slice(offset, self.chunk_rows).to_pandas()
+
+
+class _ChunkIterator(xgb.DataIter):
+    """Feeds encoded training chunks to XGBoost, which pages them out to cache_prefix"""
+
+    def __init__(self, make_chunks, cache_prefix: str):
+        self._make_chunks = make_chunks
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> int:
+        if self._chunks is None:
+            self._chunks = self._make_chunks()
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return 0
+        X, y = chunk
+        input_data(data=X, label=y)
+        return 1
+
+    def reset(self):
+        self._chunks = None
+
+
+class _SourceRows:
+    """The rows of one training job and how they are split into train and test"""
+
+    def __init__(self, tables: List[ChunkedTable], options: TrainingOptions):
+        self.split_mode = options.split_mode
+        self.train_table = tables[0]
+        self.test_table = tables[1] if len(tables) > 1 else None
+        if self.split_mode == 'supplied' and self.test_table is None:
+            raise ValueError("split_mode 'supplied' needs a testing file")
+        # random and time splits draw from training and testing rows together, like the in-memory path
+        self.tables = [self.train_table] if self.split_mode == 'supplied' else tables
+        self.timestamp_column = detect_timestamp_column(self.train_table.schema.names) \
+            if self.split_mode == 'time' else None
+        self.test_size = 0.2
+        self.cutoff = None
+
+    def scan_columns(self, columns: List[str]) -> List[str]:
+        return columns + [self.timestamp_column] if self.timestamp_column else columns
+
+    def chunks(self, columns: List[str]) -> Iterator[Tuple[pd.DataFrame, Optional[np.ndarray]]]:
+        # (chunk, test row mask); the mask of a chunk is the same on every pass
+        index = 0
+        for table in self.tables:
+            for chunk in table.chunks(self.scan_columns(columns)):
+                yield chunk, self._test_mask(index, chunk)
+                index += 1
+
+    def test_chunks(self, columns: List[str]) -> Iterator[pd.DataFrame]:
+        if self.split_mode == 'supplied':
+            yield from self.test_table.chunks(columns)
+            return
+        for chunk, test_mask in self.chunks(columns):
+            if test_mask.any():
+                yield chunk[test_mask]
+
+    def train_chunks(self, columns: List[str]) -> Iterator[pd.DataFrame]:
+        for chunk, test_mask in self.chunks(columns):
+            if test_mask is None:
+                yield chunk
+            elif not test_mask.all():
+                yield chunk[~test_mask]
+
+    def _test_mask(self, index: int, chunk: pd.DataFrame) -> Optional[np.ndarray]:
+        if self.split_mode == 'supplied':
+            return None
+        if self.split_mode == 'time':
+            if self.cutoff is None:
+                # First pass: the boundary is not known yet
+                return np.zeros(len(chunk), dtype=bool)
+            return parse_timestamps(chunk, self.timestamp_column) > self.cutoff
+        return np.random.default_rng([42, index]).random(len(chunk)) < self.test_size
+
+
+def _collect_values(values: pd.Series, test_mask: Optional[np.ndarray], stamps: Optional[np.ndarray],
+                    seen: Dict[str, Any]):
+    # Distinct values of the training rows; for time splits the earliest time each value
+    # appears, so values first seen after the cutoff can be dropped once it is known
+    if stamps is not None:
+        earliest = pd.Series(stamps).groupby(values.to_numpy()).min()
+        for value, stamp in earliest.items():
+            if value not in seen or stamp < seen[value]:
+                seen[value] = stamp
+        return
+    if test_mask is not None:
+        values = values[~test_mask]
+    for value in values.unique():
+        seen[value] = None
+
+
+def _scan_values(source: _SourceRows, categorical: List[str], target_column: str, target_is_categorical: bool):
+    # One pass over the rows: row count, timestamps and the category vocabularies, never the features
+    vocabularies = {col: {} for col in categorical + [target_column]}
+    timestamps = []
+    n_rows = 0
+    for chunk, test_mask in source.chunks(categorical + [target_column]):
+        n_rows += len(chunk)
+        stamps = None
+        if source.timestamp_column:
+            stamps = parse_timestamps(chunk, source.timestamp_column)
+            timestamps.append(stamps)
+        for col in categorical:
+            _collect_values(chunk[col].fillna(0).astype(str), test_mask, stamps, vocabularies[col])
+        target = chunk[target_column].fillna(0)
+        _collect_values(target.astype(str) if target_is_categorical else target, test_mask, stamps,
+                        vocabularies[target_column])
+    return vocabularies, timestamps, n_rows
+
+
+def train_external(registry: ModelRegistry, dataset_id: str, options: TrainingOptions,
+                   tables: List[ChunkedTable], report_progress=lambda stage: None) -> TrainingResponse:
+    TRAINING_CACHE.inc(result='bypass')
+    cache_dir = None
+    try:
+        source = _SourceRows(tables, options)
+        schema = source.train_table.schema
+        columns = schema.names
+        target_column = detect_target_column(columns)
+        feature_columns = select_feature_columns(columns, target_column)
+        categorical = [col for col in feature_columns if is_categorical(schema.field(col).type)]
+        target_is_categorical = is_categorical(schema.field(target_column).type)
+
+        vocabularies, timestamps, n_rows = _scan_values(source, categorical, target_column, target_is_categorical)
+        if n_rows == 0:
+            raise ValueError("Training file has no rows")
+        logger.info("Out-of-core training on %d rows x %d features, target column '%s', split '%s'",
+                    n_rows, len(feature_columns), target_column, options.split_mode)
+
+        report_progress('splitting')
+
+        if source.timestamp_column:
+            # Rows after the cutoff time are the test set; 8 bytes per row are held for this
+            timestamps = np.concatenate(timestamps)
+            n_test = int(np.ceil(n_rows * split_test_size(n_rows)))
+            source.cutoff = np.partition(timestamps, n_rows - n_test - 1)[n_rows - n_test - 1]
+            if source.cutoff == timestamps.max():
+                raise ValueError("All rows share the latest timestamp, nothing is left to test on")
+            del timestamps
+            for seen in vocabularies.values():
+                for value in [value for value, stamp in seen.items() if stamp > source.cutoff]:
+                    del seen[value]
+        elif source.split_mode == 'random' and split_test_size(n_rows) != source.test_size:
+            # Tiny inputs get a larger test share than the first pass assumed; scan them again so
+            # the vocabularies only hold values of the final training rows
+            source.test_size = split_test_size(n_rows)
+            vocabularies, _, _ = _scan_values(source, categorical, target_column, target_is_categorical)
+
+        report_progress('encoding')
+
+        # Encode categorical variables; unseen test values map to the encoder's reserved code
+        label_encoders = {col: CategoricalEncoder(sorted(vocabularies[col])) for col in categorical}
+        target_values = vocabularies.pop(target_column)
+        if target_is_categorical:
+            target_encoder = CategoricalEncoder(sorted(target_values))
+            classes = np.arange(len(target_encoder.classes_))
+            class_labels = target_encoder.classes_.tolist()
+        else:
+            target_encoder = None
+            classes = np.unique(np.asarray(list(target_values)))
+            if classes.dtype.kind == 'f' and np.all(np.mod(classes, 1) == 0):
+                # CSV integer columns are read as float64; keep a 0/1 target's labels integral
+                classes = classes.astype(np.int64)
+            class_labels = classes.tolist()
+        del vocabularies
+
+        missing = 0.0 if options.sparse_features else np.nan
+
+        def encode(chunk: pd.DataFrame):
+            X = fill_missing(chunk[feature_columns].copy())
+            for col, encoder in label_encoders.items():
+                X[col] = encoder.transform(X[col])
+            y = chunk[target_column].fillna(0)
+            y = target_encoder.transform(y) if target_encoder is not None else y.to_numpy()
+            return (to_csr(X) if options.sparse_features else X.to_numpy(dtype=np.float32)), y
+
+        report_progress('fitting')
+
+        params, num_boost_round, early_stopping_rounds, _ = resolve_training_params(options, len(classes))
+        if early_stopping_rounds:
+            logger.info("Early stopping is not applied to out-of-core training, fitting %d rounds", num_boost_round)
+
+        fit_start = time.perf_counter()
+        cache_dir = tempfile.mkdtemp(prefix='intelliinspect-xgb-', dir=EXTERNAL_MEMORY_DIR)
+        data_columns = feature_columns + [target_column]
+        iterator = _ChunkIterator(lambda: (encode(chunk) for chunk in source.train_chunks(data_columns)),
+                                  os.path.join(cache_dir, 'cache'))
+        dtrain = xgb.DMatrix(iterator, missing=missing)
+        booster = xgb.train(params, dtrain, num_boost_round=num_boost_round, verbose_eval=False)
+        fit_time = time.perf_counter() - fit_start
+        del dtrain
+
+        logger.info("Fitted %d rounds in %.2fs with params %s", booster.num_boosted_rounds(), fit_time, params)
+
+        report_progress('evaluating')
+
+        # Score the test rows chunk by chunk; only labels and probabilities are kept
+        labels, probabilities = [], []
+        for chunk in source.test_chunks(data_columns):
+            X_test, y_test = encode(chunk)
+            labels.append(y_test)
+            probabilities.append(booster.inplace_predict(X_test, missing=missing))
+        if not labels:
+            raise ValueError("The split left no rows to test on")
+        metrics = evaluate_predictions(np.concatenate(labels), np.concatenate(probabilities),
+                                       options.decision_threshold, options.evaluation_curve_points)
+
+        model_id = str(uuid.uuid4())
+        predictor = CompiledPredictor(booster, feature_columns, label_encoders, class_labels, missing,
+                                      options.decision_threshold)
+        registry.save(model_id, predictor, {
+            'dataset_id': dataset_id,
+            'created_at': datetime.now().isoformat(),
+            'training_profile': options.training_profile,
+            'training_params': params,
+            'target_column': target_column,
+            'num_boost_round': num_boost_round,
+            'early_stopping_rounds': None,
+            'validation_fraction': 0.0,
+            'split_mode': options.split_mode
+        })
+
+        logger.info("Stored model %s, models in memory: %d", model_id, registry.resident_count())
+
+        return TrainingResponse(
+            model_id=model_id,
+            **metrics,
+            training_profile=options.training_profile,
+            training_params=dict(params, num_boost_round=num_boost_round, early_stopping_rounds=None,
+                                 validation_fraction=0.0),
+            num_boost_rounds=booster.num_boosted_rounds(),
+            fit_time_seconds=fit_time,
+            decision_threshold=options.decision_threshold
+        )
+
+    except Exception as e:
+        logger.exception("Out-of-core training failed for dataset %s", dataset_id)
+        raise RuntimeError(f"Training failed: {str(e)}") from e
+    finally:
+        if cache_dir is not None:
+            shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,67 @@
+"""
+Readers for column-oriented training uploads (Parquet, Arrow IPC, CSV).
+Files are read straight into a DataFrame without going through per-row dicts.
+"""
+
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Optional
+
+import pandas as pd
+
+SUPPORTED_FORMATS = ('parquet', 'arrow', 'csv')
+
+FORMAT_EXTENSIONS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+    '.csv': 'csv',
+}
+
+
+def detect_format(filename: Optional[str], file_format: Optional[str] = None) -> str:
+    if file_format:
+        file_format = file_format.lower()
+        if file_format not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format '{file_format}', expected one of {', '.join(SUPPORTED_FORMATS)}")
+        return file_format
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Cannot detect format of '{filename}', pass file_format explicitly")
+    return FORMAT_EXTENSIONS[extension]
+
+
+def spool_to_disk(source: BinaryIO, suffix: str = '') -> str:
+    # Uploads are closed when the request ends, so background jobs read from a private copy
+    fd, path = tempfile.mkstemp(prefix='intelliinspect-upload-', suffix=suffix)
+    with os.fdopen(fd, 'wb') as target:
+        shutil.copyfileobj(source, target, length=1024 * 1024)
+    return path
+
+
+def open_ipc(source):
+    # Accept both the Arrow IPC file (Feather v2) and streaming formats
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def read_table(path: str, file_format: str) -> pd.DataFrame:
+    if file_format == 'parquet':
+        return pd.read_parquet(path)
+    if file_format == 'arrow':
+        import pyarrow as pa
+
+        with pa.memory_map(path, 'r') as source:
+            return open_ipc(source).read_all().to_pandas(split_blocks=True)
+    if file_format == 'csv':
+        return pd.read_csv(path)
+    raise ValueError(f"Unsupported format '{file_format}'")
@@ -0,0 +1,82 @@
+"""
+Training job status shared between worker processes.
+When the service runs several uvicorn workers, a status request can land on a
+worker other than the one running the job, so every status change is also
+written to a small JSON file in a directory all workers can read.
+"""
+
+import json
+import os
+import socket
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+ACTIVE_STATUSES = ('queued', 'running')
+HOSTNAME = socket.gethostname()
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """One JSON file per training job under job_dir, replaced atomically on every update"""
+
+    def __init__(self, job_dir: str):
+        self.job_dir = job_dir
+        os.makedirs(job_dir, exist_ok=True)
+
+    def _path(self, job_id: str) -> str:
+        # Job ids are generated uuids; reject anything that could escape the directory
+        if not job_id or os.path.basename(job_id) != job_id or job_id.startswith('.'):
+            raise KeyError(job_id)
+        return os.path.join(self.job_dir, f"{job_id}.json")
+
+    def save(self, job: Dict[str, Any]):
+        # Active jobs record their worker so others can tell when it died mid-run
+        if job['status'] in ACTIVE_STATUSES:
+            job = dict(job, worker_host=HOSTNAME, worker_pid=os.getpid())
+        path = self._path(job['job_id'])
+        staging_path = f"{path}.{os.getpid()}.tmp"
+        with open(staging_path, 'w') as f:
+            json.dump(job, f)
+        os.replace(staging_path, path)
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(job_id)) as f:
+                job = json.load(f)
+        except (KeyError, FileNotFoundError):
+            return None
+        if self._orphaned(job):
+            job.update(status='failed', error="The worker running this job stopped before it finished",
+                       finished_at=datetime.now().isoformat())
+            self.save(job)
+        return job
+
+    def delete(self, job_id: str):
+        try:
+            os.remove(self._path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def recover(self, history: int):
+        # Run at startup: fail jobs whose worker is gone and keep the newest `history`
+        # finished jobs, so the directory does not grow across restarts
+        jobs = [self.load(name[:-len('.json')]) for name in os.listdir(self.job_dir) if name.endswith('.json')]
+        finished = [job for job in jobs if job is not None and job['status'] not in ACTIVE_STATUSES]
+        finished.sort(key=lambda job: job.get('finished_at') or '')
+        for job in finished[:max(0, len(finished) - history)]:
+            self.delete(job['job_id'])
+
+    @staticmethod
+    def _orphaned(job: Dict[str, Any]) -> bool:
+        # Only jobs of this host can be checked; a pid is all a same-host worker leaves behind
+        return (job['status'] in ACTIVE_STATUSES and job.get('worker_host') == HOSTNAME
+                and job.get('worker_pid') is not None and not _process_alive(job['worker_pid']))
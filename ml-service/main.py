@@ -1,293 +1,562 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
-import xgboost as xgb
-import json
+from fastapi import APIRouter, FastAPI, HTTPException, File, Form, UploadFile, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Optional
+import importlib
+import logging
+import os
+import sys
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+
+# "full" serves training and inference; "inference" only scores saved models and never
+# loads the training stack. XGBoost imports pandas and scikit-learn for its optional
+# integrations when they are installed, so hide them from inference-only workers
+ML_SERVICE_MODE = os.environ.get("ML_SERVICE_MODE", "full").lower()
+if ML_SERVICE_MODE not in ("full", "inference"):
+    raise ValueError(f"ML_SERVICE_MODE must be 'full' or 'inference', got '{ML_SERVICE_MODE}'")
+if ML_SERVICE_MODE == "inference":
+    for module in ("pandas", "sklearn", "pyarrow"):
+        sys.modules.setdefault(module, None)
+
+from batching import MicroBatcher
+from jobstore import JobStore
+from metrics import (REGISTRY, CONTENT_TYPE, Gauge, MetricsMiddleware, PREDICTED_ROWS, StageClock,
+                     TRAINING_JOBS, observe_stage)
+from registry import ModelRegistry
+from schemas import (CUSTOM_TRAINING_PARAMS, BatchPredictionItem, BatchPredictionRequest, BatchPredictionResponse,
+                     IncrementalTrainingRequest, PredictionRequest, PredictionResponse, SimulationRequest,
+                     TrainingJobStatus, TrainingOptions, TrainingRequest, TrainingResponse)
+import simulation
+
+
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("ml_service")
 
 app = FastAPI(title="IntelliInspect ML Service", version="1.0.0")
+app.add_middleware(MetricsMiddleware)
+# Endpoints that need the training stack (training and file uploads); only mounted in full mode
+training_router = APIRouter()
+
+# Trained models are persisted on disk and loaded lazily into a bounded LRU cache
+MODEL_DIR = os.environ.get("MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+MODEL_CACHE_MAX_MODELS = int(os.environ.get("MODEL_CACHE_MAX_MODELS", "8"))
+MODEL_CACHE_MAX_BYTES = int(os.environ["MODEL_CACHE_MAX_BYTES"]) if os.environ.get("MODEL_CACHE_MAX_BYTES") else None
 
-# Global storage for models and data
-models_storage = {}
-data_storage = {}
+model_registry = ModelRegistry(MODEL_DIR, max_models=MODEL_CACHE_MAX_MODELS, max_bytes=MODEL_CACHE_MAX_BYTES)
+REGISTRY.register(Gauge('ml_resident_models', 'Models currently loaded in memory', model_registry.resident_count))
 
-class TrainingRequest(BaseModel):
-    dataset_id: str
-    training_data: List[Dict[str, Any]]
-    testing_data: List[Dict[str, Any]]
+# Optional micro-batching: concurrent /predict calls for the same model are scored
+# together off the event loop, waiting at most PREDICT_BATCH_MAX_WAIT_MS for company
+PREDICT_BATCHING = os.environ.get("PREDICT_BATCHING", "0").lower() in ("1", "true", "yes")
+PREDICT_BATCH_MAX_WAIT_MS = float(os.environ.get("PREDICT_BATCH_MAX_WAIT_MS", "2"))
+PREDICT_BATCH_MAX_SIZE = int(os.environ.get("PREDICT_BATCH_MAX_SIZE", "64"))
+PREDICT_BATCH_WORKERS = int(os.environ.get("PREDICT_BATCH_WORKERS", "2"))
 
-class PredictionRequest(BaseModel):
-    model_id: str
-    data: Dict[str, Any]
+prediction_batcher = MicroBatcher(
+    ThreadPoolExecutor(max_workers=PREDICT_BATCH_WORKERS, thread_name_prefix="predict"),
+    max_wait=PREDICT_BATCH_MAX_WAIT_MS / 1000, max_size=PREDICT_BATCH_MAX_SIZE
+) if PREDICT_BATCHING else None
 
-class TrainingResponse(BaseModel):
-    model_id: str
-    accuracy: float
-    precision: float
-    recall: float
-    f1_score: float
-    confusion_matrix: List[List[int]]
+# Training runs in a bounded worker pool so the event loop stays free for inference; its
+# size (TRAINING_MAX_WORKERS) is defined by the training module, which splits the CPUs by it
+TRAINING_MAX_PENDING_JOBS = int(os.environ.get("TRAINING_MAX_PENDING_JOBS", "10"))
+TRAINING_JOB_HISTORY = int(os.environ.get("TRAINING_JOB_HISTORY", "50"))
 
-class PredictionResponse(BaseModel):
-    prediction: int
-    confidence: float
+training_executor = None
+training_jobs = {}
+training_jobs_lock = threading.Lock()
+
+# Job status is mirrored to files so any uvicorn worker (WEB_CONCURRENCY > 1) can answer
+# status requests for jobs running in another worker
+TRAINING_JOB_DIR = os.environ.get("TRAINING_JOB_DIR", os.path.join(MODEL_DIR, ".jobs"))
+job_store = JobStore(TRAINING_JOB_DIR)
+job_store.recover(TRAINING_JOB_HISTORY)
+
+# Approximate progress reported for each training stage
+TRAINING_STAGES = {
+    'queued': 0.0,
+    'parsing': 0.05,
+    'preprocessing': 0.1,
+    'splitting': 0.3,
+    'encoding': 0.4,
+    'fitting': 0.5,
+    'evaluating': 0.9,
+    'completed': 1.0,
+}
+
+# Job stage -> stage label of the ml_stage_duration_seconds histogram
+TRAINING_STAGE_METRICS = {
+    'parsing': 'parse',
+    'preprocessing': 'prepare',
+    'splitting': 'split',
+    'encoding': 'encode',
+    'fitting': 'fit',
+    'evaluating': 'evaluate',
+}
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
-@app.post("/train", response_model=TrainingResponse)
-async def train_model(request: TrainingRequest):
+def update_training_job(job_id: str, **fields):
+    with training_jobs_lock:
+        job = training_jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+            if 'stage' in fields:
+                job['progress'] = TRAINING_STAGES.get(fields['stage'], job['progress'])
+            save_training_job(job)
+
+def save_training_job(job: dict):
+    # Caller holds training_jobs_lock
+    result = job['result']
+    job_store.save(dict(job, result=result.model_dump() if result is not None else None))
+
+def load_training_job(job_id: str) -> Optional[dict]:
+    # Jobs started by this worker are in memory, others only in the shared job store
+    with training_jobs_lock:
+        job = training_jobs.get(job_id)
+        if job is not None:
+            return dict(job)
+    return job_store.load(job_id)
+
+def prune_training_jobs():
+    # Keep a bounded history of finished jobs; caller holds training_jobs_lock
+    finished = [job for job in training_jobs.values() if job['status'] in ('completed', 'failed')]
+    if len(finished) > TRAINING_JOB_HISTORY:
+        finished.sort(key=lambda job: job['finished_at'])
+        for job in finished[:len(finished) - TRAINING_JOB_HISTORY]:
+            del training_jobs[job['job_id']]
+            job_store.delete(job['job_id'])
+
+async def get_model(model_id: str):
+    # Cache hits stay on the event loop; loading from disk (and the first XGBoost import)
+    # runs in the threadpool so a cold model does not stall other requests
+    predictor = model_registry.get_resident(model_id)
+    if predictor is None:
+        predictor = await run_in_threadpool(model_registry.get, model_id)
+    return predictor
+
+def check_threshold(threshold: Optional[float], name: str = 'threshold'):
+    if threshold is not None and not 0.0 <= threshold <= 1.0:
+        raise HTTPException(status_code=400, detail=f"{name} must be between 0 and 1")
+
+def check_training_options(options: TrainingOptions, upload: bool = False):
+    check_threshold(options.decision_threshold, 'decision_threshold')
+    if options.external_memory and not upload:
+        raise HTTPException(status_code=400, detail="external_memory training needs a file upload (/train/upload)")
+    if options.evaluation_curve_points is not None and options.evaluation_curve_points < 2:
+        raise HTTPException(status_code=400, detail="evaluation_curve_points must be at least 2 (or null)")
+    check_training_params(options)
+
+def check_training_params(options: TrainingOptions):
+    params = options.training_params
+    if not params:
+        return
+    if options.training_profile != 'custom':
+        raise HTTPException(status_code=400, detail="training_params are only applied with training_profile 'custom'")
+    reserved = sorted(set(params) & {'objective', 'num_class'})
+    if reserved:
+        raise HTTPException(status_code=400,
+                            detail=f"training_params cannot set {', '.join(reserved)}; the target column decides them")
+    unknown = sorted(set(params) - CUSTOM_TRAINING_PARAMS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown training_params: {', '.join(unknown)}")
+    # "custom" starts from the "small" profile, which has neither early stopping nor a validation slice
+    validation_fraction = params.get('validation_fraction') or 0.0
+    if not isinstance(validation_fraction, (int, float)) or not 0.0 <= validation_fraction < 1.0:
+        raise HTTPException(status_code=400, detail="validation_fraction must be at least 0 and below 1")
+    if params.get('early_stopping_rounds') and validation_fraction == 0.0:
+        raise HTTPException(status_code=400, detail="early_stopping_rounds needs a validation_fraction above 0")
+
+def check_chunk_size(chunk_size: Optional[int]) -> int:
+    if chunk_size is None:
+        return simulation.SIMULATION_CHUNK_ROWS
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be at least 1")
+    return chunk_size
+
+def score_in_chunks(score, chunks):
+    # Iterated from Starlette's threadpool while the response streams, one chunk per step
+    for chunk in chunks:
+        with observe_stage('predict'):
+            results = score(chunk)
+        PREDICTED_ROWS.inc(len(results), endpoint='simulate')
+        yield results
+
+async def import_lazily(name: str):
+    # Training modules pull in pandas, scikit-learn and pyarrow; they are imported on the
+    # first training request, off the event loop so the worker keeps serving meanwhile
+    return await run_in_threadpool(importlib.import_module, name)
+
+def get_training_executor(training) -> ThreadPoolExecutor:
+    # Created with the first training job, once the training module is loaded
+    global training_executor
+    if training_executor is None:
+        training_executor = ThreadPoolExecutor(max_workers=training.TRAINING_MAX_WORKERS,
+                                               thread_name_prefix="training")
+    return training_executor
+
+def run_training_job(job_id: str, load_data, train, cleanup=lambda: None):
+    # load_data returns the (training, testing) DataFrames and runs inside the worker;
+    # train(frames, report_progress) returns the TrainingResponse
+    update_training_job(job_id, status='running', started_at=datetime.now().isoformat())
+    stage_clock = StageClock()
+    
+    def report_progress(stage):
+        stage_clock.enter(TRAINING_STAGE_METRICS.get(stage))
+        update_training_job(job_id, stage=stage)
+    
     try:
-        # Convert to DataFrame
-        train_df = pd.DataFrame(request.training_data)
-        test_df = pd.DataFrame(request.testing_data)
-        
-        # Combine data for better training with small datasets
-        all_data = pd.concat([train_df, test_df], ignore_index=True)
-        
-        # Handle missing values in sparse datasets
-        print(f"DEBUG: Missing values before cleanup: {all_data.isnull().sum().sum()}")
-        all_data = all_data.fillna(0)  # Fill missing values with 0 for numerical data
-        print(f"DEBUG: Dataset cleaned, shape: {all_data.shape}")
-        
-        # Smart target column detection - look for common target names or last column
-        target_column = None
-        for col in all_data.columns:
-            if col.lower() in ['quality', 'pass', 'fail', 'status', 'result', 'target', 'label', 'response', 'output', 'class', 'y']:
-                target_column = col
-                break
-        
-        if target_column is None:
-            target_column = all_data.columns[-1]
-        
-        # Remove timestamp columns and ID columns if they exist
-        feature_columns = [col for col in all_data.columns 
-                          if col != target_column and 
-                          'timestamp' not in col.lower() and 
-                          'time' not in col.lower() and
-                          'date' not in col.lower() and
-                          col.lower() != 'id']
-        
-        # Handle very wide datasets (limit features for memory management)
-        if len(feature_columns) > 500:
-            print(f"DEBUG: Wide dataset detected ({len(feature_columns)} features), selecting top 300 features")
-            # Keep only columns with non-zero values to reduce sparsity
-            feature_importance = all_data[feature_columns].apply(lambda x: (x != 0).sum(), axis=0)
-            top_features = feature_importance.nlargest(300).index.tolist()
-            feature_columns = top_features
-        
-        print(f"DEBUG: Dataset shape: {all_data.shape}")
-        print(f"DEBUG: Target column: {target_column}")
-        print(f"DEBUG: Feature columns count: {len(feature_columns)}")
-        print(f"DEBUG: Target values: {all_data[target_column].value_counts().to_dict()}")
-        
-        # Prepare features and target
-        X = all_data[feature_columns].copy()
-        y = all_data[target_column].copy()
-        
-        # Split into train/test (use larger test set for better metrics)
-        from sklearn.model_selection import train_test_split
-        test_size = max(0.3, 8/len(all_data)) if len(all_data) < 50 else 0.2
-        
-        # Safely handle stratification
-        try:
-            if len(y.unique()) > 1 and len(y) >= 4:  # Need at least 2 samples per class
-                X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42, stratify=y)
-            else:
-                X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
-        except Exception as split_error:
-            print(f"DEBUG: Stratified split failed: {split_error}, using regular split")
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
-        
-        # Handle categorical variables with unseen value handling
-        label_encoders = {}
-        for col in X_train.columns:
-            if X_train[col].dtype == 'object':
-                le = LabelEncoder()
-                
-                # Fit on training data
-                X_train[col] = le.fit_transform(X_train[col].astype(str))
-                
-                # Handle unseen values in test data
-                test_values = X_test[col].astype(str)
-                seen_values = set(le.classes_)
-                
-                # Replace unseen values with the most common training value
-                most_common_value = le.classes_[0]  # First class (most common after sorting)
-                test_values_handled = test_values.apply(lambda x: x if x in seen_values else most_common_value)
-                
-                X_test[col] = le.transform(test_values_handled)
-                label_encoders[col] = le
-                
-                print(f"DEBUG: Column {col} - Training classes: {len(le.classes_)}, Handled unseen values in test")
-        
-        # Encode target variable if necessary with unseen value handling
-        target_encoder = None
-        if y_train.dtype == 'object':
-            target_encoder = LabelEncoder()
-            
-            # Fit on training targets
-            y_train = target_encoder.fit_transform(y_train.astype(str))
-            
-            # Handle unseen values in test targets
-            test_targets = y_test.astype(str)
-            seen_targets = set(target_encoder.classes_)
-            most_common_target = target_encoder.classes_[0]
-            
-            test_targets_handled = test_targets.apply(lambda x: x if x in seen_targets else most_common_target)
-            y_test = target_encoder.transform(test_targets_handled)
-            
-            print(f"DEBUG: Target variable - Training classes: {target_encoder.classes_}, Test handled")
-        
-        print(f"DEBUG: Training set shape: {X_train.shape}, Test set shape: {X_test.shape}")
-        print(f"DEBUG: Training target distribution: {pd.Series(y_train).value_counts().to_dict()}")
-        print(f"DEBUG: Test target distribution: {pd.Series(y_test).value_counts().to_dict()}")
-        
-        # Train XGBoost model with better parameters for small datasets
-        model = xgb.XGBClassifier(
-            random_state=42, 
-            eval_metric='logloss',
-            max_depth=3,  # Prevent overfitting on small data
-            n_estimators=50,  # Fewer trees for small data
-            learning_rate=0.1
-        )
-        model.fit(X_train, y_train)
-        
-        # Make predictions
-        y_pred = model.predict(X_test)
-        y_pred_proba = model.predict_proba(X_test)
-        
-        print(f"DEBUG: Predictions: {y_pred.tolist()}")
-        print(f"DEBUG: Actual: {y_test.tolist()}")
-        print(f"DEBUG: Unique predictions: {np.unique(y_pred)}")
-        print(f"DEBUG: Unique actual: {np.unique(y_test)}")
-        
-        # Calculate metrics
-        accuracy = accuracy_score(y_test, y_pred)
-        
-        # Handle edge cases for precision/recall when classes are missing
-        try:
-            precision = precision_score(y_test, y_pred, average='weighted', zero_division=0)
-            recall = recall_score(y_test, y_pred, average='weighted', zero_division=0)
-            f1 = f1_score(y_test, y_pred, average='weighted', zero_division=0)
-        except:
-            precision = accuracy
-            recall = accuracy  
-            f1 = accuracy
-        
-        cm = confusion_matrix(y_test, y_pred).tolist()
-        
-        print(f"DEBUG: Final metrics - Accuracy: {accuracy:.3f}, Precision: {precision:.3f}, Recall: {recall:.3f}, F1: {f1:.3f}")
-        
-        # Clean up old models to prevent memory buildup (keep only last 3)
-        if len(models_storage) >= 3:
-            oldest_models = sorted(models_storage.items(), 
-                                 key=lambda x: x[1]['created_at'])
-            for old_id, _ in oldest_models[:-2]:  # Keep only 2 most recent
-                print(f"DEBUG: Cleaning up old model: {old_id}")
-                del models_storage[old_id]
-        
-        # Store model and metadata
-        model_id = str(uuid.uuid4())
-        models_storage[model_id] = {
-            'model': model,
-            'label_encoders': label_encoders,
-            'target_encoder': target_encoder,
-            'feature_columns': list(feature_columns),
-            'created_at': datetime.now().isoformat()
+        report_progress('parsing')
+        # Hand the frames over in a list so training can drop them once they are combined
+        frames = list(load_data())
+        report_progress('preprocessing')
+        result = train(frames, report_progress)
+        stage_clock.stop()
+        update_training_job(job_id, status='completed', stage='completed', result=result,
+                            finished_at=datetime.now().isoformat())
+        TRAINING_JOBS.inc(status='completed')
+    except Exception as e:
+        stage_clock.stop()
+        update_training_job(job_id, status='failed', error=str(e), finished_at=datetime.now().isoformat())
+        TRAINING_JOBS.inc(status='failed')
+    finally:
+        cleanup()
+
+def create_training_job(result: Optional[TrainingResponse] = None) -> TrainingJobStatus:
+    # A result from the training cache makes a job that is completed from the start
+    with training_jobs_lock:
+        pending = sum(1 for job in training_jobs.values() if job['status'] in ('queued', 'running'))
+        if result is None and pending >= TRAINING_MAX_PENDING_JOBS:
+            raise HTTPException(status_code=429, detail="Too many training jobs in progress, try again later")
+        
+        job_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        training_jobs[job_id] = {
+            'job_id': job_id,
+            'status': 'queued' if result is None else 'completed',
+            'stage': 'queued' if result is None else 'completed',
+            'progress': TRAINING_STAGES['queued' if result is None else 'completed'],
+            'created_at': now,
+            'started_at': None if result is None else now,
+            'finished_at': None if result is None else now,
+            'error': None,
+            'result': result
         }
-        
-        print(f"DEBUG: Stored model {model_id}, total models in memory: {len(models_storage)}")
-        
-        return TrainingResponse(
-            model_id=model_id,
-            accuracy=float(accuracy),
-            precision=float(precision),
-            recall=float(recall),
-            f1_score=float(f1),
-            confusion_matrix=cm
-        )
-        
+        if result is not None:
+            TRAINING_JOBS.inc(status='completed')
+        save_training_job(training_jobs[job_id])
+        prune_training_jobs()
+        return TrainingJobStatus(**training_jobs[job_id])
+
+@training_router.post("/train", response_model=TrainingJobStatus, status_code=202)
+async def submit_training(request: TrainingRequest):
+    options = TrainingOptions(**request.model_dump(include=set(TrainingOptions.model_fields)))
+    check_training_options(options)
+    if options.split_mode == 'supplied' and not (request.training_data and request.testing_data):
+        raise HTTPException(status_code=400, detail="split_mode 'supplied' needs both training_data and testing_data")
+    training = await import_lazily('training')
+    frames = list(await run_in_threadpool(training.records_to_frames, request.training_data, request.testing_data))
+    # The row dicts are no longer needed once the frames exist
+    request.training_data = []
+    request.testing_data = []
+    fingerprint, cached = await run_in_threadpool(training.lookup_training_cache, model_registry, request.dataset_id,
+                                                  options, partial(training.training_fingerprint, frames, options))
+    if cached is not None:
+        return create_training_job(cached)
+    job = create_training_job()
+    
+    def load_data():
+        # Hand the frames over so the job holds the only reference to them
+        loaded = frames[:]
+        frames.clear()
+        return loaded
+    
+    get_training_executor(training).submit(run_training_job, job.job_id, load_data,
+                                           partial(training.train_with_cache, model_registry,
+                                                   request.dataset_id, options, fingerprint))
+    return job
+
+@training_router.post("/train/incremental", response_model=TrainingJobStatus, status_code=202)
+async def submit_incremental_training(request: IncrementalTrainingRequest):
+    # Keeps boosting an existing model on new rows only; the result is stored as a new model
+    if not model_registry.exists(request.model_id):
+        raise HTTPException(status_code=404, detail="Model not found")
+    if not request.training_data:
+        raise HTTPException(status_code=400, detail="training_data must contain at least one row")
+    if request.num_boost_round is not None and request.num_boost_round < 1:
+        raise HTTPException(status_code=400, detail="num_boost_round must be at least 1")
+    
+    training = await import_lazily('training')
+    job = create_training_job()
+    
+    def load_data():
+        frames = training.records_to_frames(request.training_data, request.testing_data)
+        request.training_data = []
+        request.testing_data = []
+        return frames
+    
+    get_training_executor(training).submit(run_training_job, job.job_id, load_data,
+                                           partial(training.train_incremental, model_registry, request.model_id,
+                                                   request.dataset_id, request.num_boost_round))
+    return job
+
+@training_router.post("/train/upload", response_model=TrainingJobStatus, status_code=202)
+async def submit_training_upload(
+    dataset_id: str = Form(...),
+    training_file: UploadFile = File(...),
+    testing_file: Optional[UploadFile] = File(None),
+    file_format: Optional[str] = Form(None),
+    options: Optional[str] = Form(None)
+):
+    # Column-oriented upload (Parquet, Arrow IPC or CSV) read straight into DataFrames;
+    # training options are passed as a JSON object in the "options" form field
+    try:
+        training_options = TrainingOptions.model_validate_json(options) if options else TrainingOptions()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid training options: {str(e)}")
+    check_training_options(training_options, upload=True)
+    if training_options.split_mode == 'supplied' and testing_file is None:
+        raise HTTPException(status_code=400, detail="split_mode 'supplied' needs a testing_file")
+    
+    ingest = await import_lazily('ingest')
+    training = await import_lazily('training')
+    external_memory = await import_lazily('external_memory') if training_options.external_memory else None
+    try:
+        uploads = [upload for upload in (training_file, testing_file) if upload is not None]
+        formats = [ingest.detect_format(upload.filename, file_format) for upload in uploads]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    paths = []
+    try:
+        for upload in uploads:
+            paths.append(await run_in_threadpool(ingest.spool_to_disk, upload.file))
     except Exception as e:
-        import traceback
-        error_msg = f"Training failed: {str(e)}"
-        full_traceback = traceback.format_exc()
-        print(f"DEBUG: Full error details:")
-        print(full_traceback)
-        raise HTTPException(status_code=400, detail=error_msg)
+        for path in paths:
+            os.remove(path)
+        raise HTTPException(status_code=400, detail=f"Upload failed: {str(e)}")
+    
+    def cleanup():
+        for path in paths:
+            os.remove(path)
+    
+    fingerprint = None
+    if not training_options.external_memory:
+        # Out-of-core jobs bypass the training cache; in-memory ones are looked up by file contents
+        fingerprint, cached = await run_in_threadpool(
+            training.lookup_training_cache, model_registry, dataset_id, training_options,
+            partial(training.file_fingerprint, paths, formats, training_options))
+        if cached is not None:
+            cleanup()
+            return create_training_job(cached)
+    try:
+        job = create_training_job()
+    except HTTPException:
+        cleanup()
+        raise
+    
+    if training_options.external_memory:
+        def load_data():
+            # Out-of-core: the job streams the spooled files in chunks instead of loading them
+            return [external_memory.ChunkedTable(path, fmt) for path, fmt in zip(paths, formats)]
+        
+        train = partial(external_memory.train_external, model_registry, dataset_id, training_options)
+    else:
+        def load_data():
+            frames = [ingest.read_table(path, fmt) for path, fmt in zip(paths, formats)]
+            if len(frames) == 1:
+                frames.append(frames[0].iloc[0:0])
+            return frames[0], frames[1]
+        
+        train = partial(training.train_with_cache, model_registry, dataset_id, training_options, fingerprint)
+    
+    get_training_executor(training).submit(run_training_job, job.job_id, load_data, train, cleanup)
+    return job
+
+@training_router.post("/simulate/upload")
+async def simulate_upload(
+    model_id: str = Form(...),
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Form(None),
+    threshold: Optional[float] = Form(None),
+    chunk_size: Optional[int] = Form(None)
+):
+    # Same NDJSON stream as /simulate, reading the simulation rows from a Parquet, Arrow IPC
+    # or CSV file chunk by chunk
+    predictor = await get_model(model_id)
+    if predictor is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    check_threshold(threshold)
+    chunk_size = check_chunk_size(chunk_size)
+    
+    ingest = await import_lazily('ingest')
+    external_memory = await import_lazily('external_memory')
+    try:
+        file_format = ingest.detect_format(file.filename, file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    path = await run_in_threadpool(ingest.spool_to_disk, file.file)
+    try:
+        table = await run_in_threadpool(external_memory.ChunkedTable, path, file_format, chunk_size)
+        missing = set(predictor.feature_columns) - set(table.schema.names)
+        if missing:
+            raise ValueError(f"Missing feature(s): {', '.join(sorted(missing))}")
+    except Exception as e:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail=f"Simulation upload failed: {str(e)}")
+    
+    def score(frame):
+        return predictor.predict_columns({col: frame[col] for col in frame.columns}, threshold)
+    
+    return StreamingResponse(simulation.stream_results(score_in_chunks(score, table.chunks(predictor.feature_columns))),
+                             media_type=simulation.MEDIA_TYPE, background=BackgroundTask(os.remove, path))
+
+@app.get("/train/{job_id}", response_model=TrainingJobStatus)
+async def get_training_job(job_id: str):
+    job = load_training_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return TrainingJobStatus(**job)
+
+@app.get("/train/{job_id}/result", response_model=TrainingResponse)
+async def get_training_result(job_id: str):
+    job = load_training_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    if job['status'] == 'failed':
+        raise HTTPException(status_code=400, detail=job['error'])
+    if job['status'] != 'completed':
+        raise HTTPException(status_code=409, detail=f"Training job is still {job['status']}")
+    return job['result']
 
 @app.post("/predict", response_model=PredictionResponse)
 async def predict(request: PredictionRequest):
+    check_threshold(request.threshold)
     try:
-        if request.model_id not in models_storage:
+        predictor = await get_model(request.model_id)
+        if predictor is None:
             raise HTTPException(status_code=404, detail="Model not found")
         
-        model_info = models_storage[request.model_id]
-        model = model_info['model']
-        label_encoders = model_info['label_encoders']
-        target_encoder = model_info['target_encoder']
-        feature_columns = model_info['feature_columns']
-        
-        # Prepare input data
-        input_df = pd.DataFrame([request.data])
-        
-        # Select only the feature columns used during training
-        input_df = input_df[feature_columns]
-        
-        # Apply label encoders with unseen value handling
-        for col, le in label_encoders.items():
-            if col in input_df.columns:
-                # Handle unseen values in prediction data
-                input_values = input_df[col].astype(str)
-                seen_values = set(le.classes_)
-                most_common_value = le.classes_[0]
-                
-                # Replace unseen values 
-                input_values_handled = input_values.apply(lambda x: x if x in seen_values else most_common_value)
-                input_df[col] = le.transform(input_values_handled)
-        
-        # Make prediction
-        prediction = model.predict(input_df)[0]
-        prediction_proba = model.predict_proba(input_df)[0]
-        
-        # Get confidence (max probability)
-        confidence = float(max(prediction_proba))
-        
-        # Decode prediction if necessary
-        if target_encoder:
-            prediction = target_encoder.inverse_transform([prediction])[0]
-        
-        # Convert prediction to binary (0/1) for pass/fail
-        prediction_binary = 1 if str(prediction).lower() in ['pass', '1', 'true'] else 0
+        # Score straight from the request dict with the model's compiled predictor
+        if prediction_batcher is not None:
+            prediction, confidence = await prediction_batcher.predict(request.model_id, predictor, request.data,
+                                                                      request.threshold)
+        else:
+            with observe_stage('predict'):
+                prediction, confidence = predictor.predict_row(request.data, request.threshold)
+        PREDICTED_ROWS.inc(endpoint='predict')
         
         return PredictionResponse(
-            prediction=int(prediction_binary),
+            prediction=prediction,
             confidence=confidence
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Prediction failed: {str(e)}")
 
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchPredictionRequest):
+    predictor = await get_model(request.model_id)
+    if predictor is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    
+    if (request.rows is None) == (request.columns is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'rows' or 'columns'")
+    check_threshold(request.threshold)
+    
+    try:
+        if request.rows is not None:
+            with observe_stage('predict'):
+                results = predictor.predict_rows(request.rows, request.threshold)
+        else:
+            lengths = {len(values) for values in request.columns.values()}
+            if len(lengths) > 1:
+                raise HTTPException(status_code=400, detail="All columns must have the same length")
+            with observe_stage('predict'):
+                results = predictor.predict_columns(request.columns, request.threshold)
+        PREDICTED_ROWS.inc(len(results), endpoint='predict_batch')
+        
+        predictions = [
+            BatchPredictionItem(index=i, prediction=prediction, confidence=confidence, error=error)
+            for i, (prediction, confidence, error) in enumerate(results)
+        ]
+        error_count = sum(1 for item in predictions if item.error is not None)
+        
+        return BatchPredictionResponse(
+            model_id=request.model_id,
+            total=len(predictions),
+            error_count=error_count,
+            predictions=predictions
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Batch prediction failed: {str(e)}")
+
+@app.post("/simulate")
+async def simulate(request: SimulationRequest):
+    # Scores a whole simulation batch in chunks of chunk_size rows and streams NDJSON:
+    # a line per row with its prediction and the running pass/fail statistics, then a summary
+    predictor = await get_model(request.model_id)
+    if predictor is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    
+    if (request.rows is None) == (request.columns is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'rows' or 'columns'")
+    check_threshold(request.threshold)
+    chunk_size = check_chunk_size(request.chunk_size)
+    
+    if request.rows is not None:
+        rows = request.rows
+        chunks = (rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size))
+        score = partial(predictor.predict_rows, threshold=request.threshold)
+    else:
+        lengths = {len(values) for values in request.columns.values()}
+        if len(lengths) > 1:
+            raise HTTPException(status_code=400, detail="All columns must have the same length")
+        columns = request.columns
+        chunks = ({col: values[start:start + chunk_size] for col, values in columns.items()}
+                  for start in range(0, lengths.pop() if lengths else 0, chunk_size))
+        score = partial(predictor.predict_columns, threshold=request.threshold)
+    
+    return StreamingResponse(simulation.stream_results(score_in_chunks(score, chunks)),
+                             media_type=simulation.MEDIA_TYPE)
+
 @app.get("/models")
 async def list_models():
     return {
         "models": [
             {
-                "model_id": model_id,
+                "model_id": info["model_id"],
                 "created_at": info["created_at"],
-                "feature_count": len(info["feature_columns"])
+                "feature_count": info["feature_count"]
             }
-            for model_id, info in models_storage.items()
+            for info in model_registry.list_models()
         ]
     }
 
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text exposition format; counters belong to this worker process only
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+if ML_SERVICE_MODE == "full":
+    app.include_router(training_router)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,225 @@
+"""
+Minimal Prometheus metrics for the IntelliInspect ML service.
+Counters, gauges and histograms rendered in the Prometheus text exposition format.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Covers sub-millisecond predictions as well as multi-minute training fits
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, function: Optional[Callable[[], float]] = None):
+        # Gauges here are unlabelled and either set directly or read from a callback
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._function = function
+
+    def set(self, value: float):
+        self._value = value
+
+    def samples(self):
+        value = self._function() if self._function is not None else self._value
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}  # label values -> [bucket counts..., sum]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.register(Counter(
+    'ml_http_requests_total', 'HTTP requests handled, by route and status code',
+    ('method', 'route', 'status')))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'ml_http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route')))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'ml_stage_duration_seconds', 'Time spent per pipeline stage (parse, encode, split, fit, evaluate, predict)',
+    ('stage',)))
+PREDICTED_ROWS = REGISTRY.register(Counter(
+    'ml_predicted_rows_total', 'Rows scored, by endpoint', ('endpoint',)))
+MODEL_CACHE = REGISTRY.register(Counter(
+    'ml_model_cache_requests_total', 'Model registry lookups by result (hit, miss, not_found)', ('result',)))
+TRAINING_JOBS = REGISTRY.register(Counter(
+    'ml_training_jobs_total', 'Finished training jobs by status', ('status',)))
+PREDICT_BATCH_ROWS = REGISTRY.register(Histogram(
+    'ml_predict_batch_rows', 'Rows per micro-batch of coalesced /predict calls', (),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)))
+TRAINING_CACHE = REGISTRY.register(Counter(
+    'ml_training_cache_requests_total', 'Training result cache lookups by result (hit, miss, bypass)', ('result',)))
+
+
+def observe_stage(stage: str):
+    return STAGE_SECONDS.time(stage=stage)
+
+
+class StageClock:
+    """Records the time between consecutive stage transitions in STAGE_SECONDS"""
+
+    def __init__(self, stage: Optional[str] = None):
+        self._stage = stage
+        self._start = time.perf_counter()
+
+    def enter(self, stage: Optional[str]):
+        now = time.perf_counter()
+        if self._stage is not None:
+            STAGE_SECONDS.observe(now - self._start, stage=self._stage)
+        self._stage = stage
+        self._start = now
+
+    def stop(self):
+        self.enter(None)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and latency per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {'code': 500}
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; templates keep label cardinality low
+            route = scope.get('route')
+            path = getattr(route, 'path', 'unmatched')
+            REQUESTS.inc(method=scope['method'], route=path, status=str(status['code']))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope['method'], route=path)
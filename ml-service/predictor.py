@@ -0,0 +1,157 @@
+"""
+Compiled low-latency predictor for trained IntelliInspect models.
+Only depends on NumPy and the XGBoost booster so it can run per request
+without building pandas objects.
+"""
+
+import json
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from encoding import CategoricalEncoder
+
+
+def to_binary_prediction(prediction) -> int:
+    # Convert prediction to binary (0/1) for pass/fail
+    return 1 if str(prediction).lower() in ['pass', '1', 'true'] else 0
+
+
+def normalize_class_label(label):
+    # A numeric target with a missing value is stored as float by pandas; 1.0 must still mean pass
+    if isinstance(label, (float, np.floating)) and float(label).is_integer():
+        return int(label)
+    return label
+
+
+class CompiledPredictor:
+    """Scores rows straight from request dicts using precomputed lookup tables"""
+
+    def __init__(self, booster, feature_columns: Sequence[str],
+                 encoders: Dict[str, CategoricalEncoder], class_labels: Sequence[Any],
+                 missing: float = np.nan, threshold: float = 0.5):
+        self.booster = booster
+        self.feature_columns = list(feature_columns)
+        self.encoders = encoders
+        self.class_labels = [normalize_class_label(label) for label in class_labels]
+        # Models trained on sparse (CSR) input treat 0 as missing, like they did in training
+        self.missing = missing
+        # Binary models predict class 1 when P(class 1) > threshold
+        self.threshold = threshold
+
+        # Fixed feature order: (column, encoder or None for numeric columns)
+        self._plan = [(col, encoders.get(col)) for col in self.feature_columns]
+        # Per-column dict lookup tables and unseen codes for the single-row path
+        self._row_plan = [
+            (col, encoder.mapping, encoder.unseen_code) if encoder is not None else (col, None, None)
+            for col, encoder in self._plan
+        ]
+
+        # Binary objectives return P(class 1) only, multi-class ones return a row per class
+        config = json.loads(booster.save_config())
+        self._multiclass = config['learner']['objective']['name'].startswith('multi:')
+        n_outputs = len(class_labels) if self._multiclass else 2
+        labels = [self.class_labels[i] if i < len(self.class_labels) else i for i in range(n_outputs)]
+        self._binary_labels = np.array([to_binary_prediction(label) for label in labels], dtype=np.int64)
+
+        # Preallocated single-row input buffer, shared across calls
+        self._buffer = np.empty((1, len(self.feature_columns)), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def _score(self, matrix: np.ndarray, threshold: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        output = self.booster.inplace_predict(matrix, missing=self.missing)
+        if self._multiclass:
+            class_indexes = output.argmax(axis=1)
+            confidences = output.max(axis=1)
+        else:
+            class_indexes = (output > (self.threshold if threshold is None else threshold)).astype(np.int64)
+            # Probability of the predicted class
+            confidences = np.where(class_indexes == 1, output, 1.0 - output)
+        return self._binary_labels[class_indexes], confidences
+
+    def predict_row(self, data: Dict[str, Any], threshold: Optional[float] = None) -> Tuple[int, float]:
+        with self._lock:
+            row = self._buffer[0]
+            for i, (col, table, unseen_code) in enumerate(self._row_plan):
+                try:
+                    value = data[col]
+                except KeyError:
+                    # Same message as predict_rows, which the micro-batched /predict path uses
+                    missing = set(self.feature_columns) - data.keys()
+                    raise ValueError(f"Missing feature(s): {', '.join(sorted(missing))}") from None
+                if table is not None:
+                    row[i] = table.get(str(value), unseen_code)
+                else:
+                    row[i] = np.nan if value is None else value
+            predictions, confidences = self._score(self._buffer, threshold)
+        return int(predictions[0]), float(confidences[0])
+
+    def encode_columns(self, columns: Dict[str, Sequence[Any]], n_rows: int) -> Tuple[np.ndarray, Dict[int, str]]:
+        # Columnar input -> float32 matrix in feature order, plus per-row errors
+        matrix = np.empty((n_rows, len(self._plan)), dtype=np.float32)
+        row_errors = {}
+        for j, (col, encoder) in enumerate(self._plan):
+            values = columns[col]
+            if encoder is not None:
+                matrix[:, j] = encoder.transform(values)
+                continue
+            try:
+                matrix[:, j] = np.asarray(values, dtype=np.float32)
+            except (TypeError, ValueError):
+                # Fall back to per-value parsing to find the offending rows
+                for i, value in enumerate(values):
+                    try:
+                        matrix[i, j] = np.nan if value is None else float(value)
+                    except (TypeError, ValueError):
+                        matrix[i, j] = np.nan
+                        row_errors.setdefault(i, f"Non-numeric value for feature '{col}'")
+        return matrix, row_errors
+
+    def predict_matrix(self, matrix: np.ndarray, threshold: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if len(matrix) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return self._score(matrix, threshold)
+
+    def predict_rows(self, rows: List[Dict[str, Any]],
+                     threshold: Optional[float] = None) -> List[Tuple[Optional[int], Optional[float], Optional[str]]]:
+        # Scores a list of row dicts in one pass; returns (prediction, confidence, error) per row
+        required = set(self.feature_columns)
+        row_errors = {}
+        for i, row in enumerate(rows):
+            missing = required - row.keys()
+            if missing:
+                row_errors[i] = f"Missing feature(s): {', '.join(sorted(missing))}"
+        columns = {col: [row.get(col) for row in rows] for col in self.feature_columns}
+        return self._predict_columns(columns, len(rows), row_errors, threshold)
+
+    def predict_columns(self, columns: Dict[str, Sequence[Any]],
+                        threshold: Optional[float] = None) -> List[Tuple[Optional[int], Optional[float], Optional[str]]]:
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        missing = set(self.feature_columns) - columns.keys()
+        row_errors = {}
+        if missing:
+            message = f"Missing feature(s): {', '.join(sorted(missing))}"
+            row_errors = {i: message for i in range(n_rows)}
+            columns = dict(columns, **{col: [None] * n_rows for col in missing})
+        return self._predict_columns(columns, n_rows, row_errors, threshold)
+
+    def _predict_columns(self, columns, n_rows, row_errors, threshold=None):
+        matrix, value_errors = self.encode_columns(columns, n_rows)
+        for i, message in value_errors.items():
+            row_errors.setdefault(i, message)
+
+        valid_mask = np.ones(n_rows, dtype=bool)
+        if row_errors:
+            valid_mask[list(row_errors)] = False
+        predictions, confidences = self.predict_matrix(matrix[valid_mask] if row_errors else matrix, threshold)
+
+        results = []
+        valid_position = 0
+        for i in range(n_rows):
+            if i in row_errors:
+                results.append((None, None, row_errors[i]))
+                continue
+            results.append((int(predictions[valid_position]), float(confidences[valid_position]), None))
+            valid_position += 1
+        return results
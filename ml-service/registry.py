@@ -0,0 +1,207 @@
+"""
+On-disk model registry for the IntelliInspect ML service.
+Each trained model is saved as a native XGBoost booster plus a small JSON
+metadata file, loaded lazily on first use and kept in an LRU cache.
+The model directory can be shared by several worker processes: an append-only
+manifest lists every saved model, so any worker can find models trained by
+another one without scanning the directory.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from encoding import CategoricalEncoder
+from metrics import MODEL_CACHE
+from predictor import CompiledPredictor
+
+BOOSTER_FILE = "model.ubj"
+METADATA_FILE = "metadata.json"
+MANIFEST_FILE = "manifest.jsonl"
+MANIFEST_LOCK_FILE = "manifest.lock"
+
+# Metadata fields copied into the manifest, enough to list models without opening them
+MANIFEST_FIELDS = ('model_id', 'created_at', 'dataset_id', 'training_profile', 'parent_model_id')
+
+
+def _json_value(value):
+    # NumPy scalars (e.g. class labels) are not JSON serializable
+    return value.item() if hasattr(value, 'item') else value
+
+
+class ModelRegistry:
+    """Persists models under model_dir and keeps recently used ones in memory"""
+
+    def __init__(self, model_dir: str, max_models: int = 8, max_bytes: Optional[int] = None):
+        self.model_dir = model_dir
+        self.max_models = max(1, max_models)
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()  # model_id -> (predictor, size in bytes)
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+        self._manifest_path = os.path.join(model_dir, MANIFEST_FILE)
+        self._manifest = OrderedDict()  # model_id -> manifest entry
+        self._manifest_offset = 0
+        os.makedirs(model_dir, exist_ok=True)
+        # Workers starting together must not each rebuild it over lines another one appended
+        with self._manifest_lock():
+            if not os.path.exists(self._manifest_path):
+                self._rebuild_manifest()
+
+    def _model_path(self, model_id: str) -> str:
+        # Model ids are generated uuids; reject anything that could escape the directory
+        if not model_id or os.path.basename(model_id) != model_id or model_id.startswith('.'):
+            raise KeyError(model_id)
+        return os.path.join(self.model_dir, model_id)
+
+    def save(self, model_id: str, predictor: CompiledPredictor, metadata: Dict[str, Any]):
+        metadata = dict(metadata, model_id=model_id,
+                        feature_columns=predictor.feature_columns,
+                        encoders={col: encoder.to_dict() for col, encoder in predictor.encoders.items()},
+                        class_labels=[_json_value(label) for label in predictor.class_labels],
+                        missing=None if np.isnan(predictor.missing) else predictor.missing,
+                        decision_threshold=predictor.threshold)
+
+        # Write into a temporary directory first so readers never see a half-written model
+        staging_dir = tempfile.mkdtemp(prefix=f".{model_id}-", dir=self.model_dir)
+        try:
+            predictor.booster.save_model(os.path.join(staging_dir, BOOSTER_FILE))
+            with open(os.path.join(staging_dir, METADATA_FILE), 'w') as f:
+                json.dump(metadata, f)
+            os.replace(staging_dir, self._model_path(model_id))
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        self._append_manifest(metadata)
+        self._put(model_id, predictor, os.path.getsize(os.path.join(self._model_path(model_id), BOOSTER_FILE)))
+
+    def exists(self, model_id: str) -> bool:
+        try:
+            return os.path.isfile(os.path.join(self._model_path(model_id), METADATA_FILE))
+        except KeyError:
+            return False
+
+    def get_resident(self, model_id: str) -> Optional[CompiledPredictor]:
+        # Cache lookup only; never touches the disk, so it is safe on the event loop
+        with self._lock:
+            entry = self._cache.get(model_id)
+            if entry is None:
+                return None
+            self._cache.move_to_end(model_id)
+        MODEL_CACHE.inc(result='hit')
+        return entry[0]
+
+    def get(self, model_id: str) -> Optional[CompiledPredictor]:
+        predictor = self.get_resident(model_id)
+        if predictor is not None:
+            return predictor
+
+        if not self.exists(model_id):
+            MODEL_CACHE.inc(result='not_found')
+            return None
+
+        MODEL_CACHE.inc(result='miss')
+        # Lazy load on first use; XGBoost itself is only imported once a model is needed
+        import xgboost as xgb
+        path = self._model_path(model_id)
+        metadata = self.load_metadata(model_id)
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(path, BOOSTER_FILE))
+        encoders = {col: CategoricalEncoder.from_dict(data) for col, data in metadata['encoders'].items()}
+        missing = metadata.get('missing')
+        predictor = CompiledPredictor(booster, metadata['feature_columns'], encoders, metadata['class_labels'],
+                                      np.nan if missing is None else missing, metadata.get('decision_threshold', 0.5))
+        self._put(model_id, predictor, os.path.getsize(os.path.join(path, BOOSTER_FILE)))
+        return predictor
+
+    def load_metadata(self, model_id: str) -> Dict[str, Any]:
+        with open(os.path.join(self._model_path(model_id), METADATA_FILE)) as f:
+            return json.load(f)
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        # New entries appended by any worker are picked up incrementally
+        with self._lock:
+            self._read_manifest()
+            entries = list(self._manifest.values())
+        return sorted((entry for entry in entries if self.exists(entry['model_id'])),
+                      key=lambda entry: entry['created_at'])
+
+    def _manifest_entry(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        entry = {field: metadata.get(field) for field in MANIFEST_FIELDS}
+        entry['feature_count'] = len(metadata['feature_columns'])
+        return entry
+
+    def _append_manifest(self, metadata: Dict[str, Any]):
+        # One short O_APPEND write per model, so concurrent writers never interleave lines
+        line = json.dumps(self._manifest_entry(metadata)) + '\n'
+        with self._manifest_lock():
+            fd = os.open(self._manifest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode())
+            finally:
+                os.close(fd)
+
+    @contextmanager
+    def _manifest_lock(self):
+        # Cross-process lock held while the manifest is rebuilt or appended to
+        fd = os.open(os.path.join(self.model_dir, MANIFEST_LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _read_manifest(self):
+        # Caller holds self._lock; only the bytes added since the last read are parsed
+        try:
+            with open(self._manifest_path, 'rb') as f:
+                f.seek(self._manifest_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        complete = data[:data.rfind(b'\n') + 1]
+        for line in complete.splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                self._manifest[entry['model_id']] = entry
+        self._manifest_offset += len(complete)
+
+    def _rebuild_manifest(self):
+        # Model directories written before the manifest existed; caller holds the manifest lock
+        entries = []
+        for model_id in os.listdir(self.model_dir):
+            if not model_id.startswith('.') and self.exists(model_id):
+                entries.append(self._manifest_entry(self.load_metadata(model_id)))
+        staging_path = self._manifest_path + f'.{os.getpid()}.tmp'
+        with open(staging_path, 'w') as f:
+            for entry in sorted(entries, key=lambda entry: entry['created_at']):
+                f.write(json.dumps(entry) + '\n')
+        os.replace(staging_path, self._manifest_path)
+
+    def resident_count(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    def _put(self, model_id: str, predictor: CompiledPredictor, size: int):
+        with self._lock:
+            previous = self._cache.pop(model_id, None)
+            if previous is not None:
+                self._cache_bytes -= previous[1]
+            self._cache[model_id] = (predictor, size)
+            self._cache_bytes += size
+
+            # Evict least recently used models, always keeping the newest one
+            while len(self._cache) > 1 and (
+                    len(self._cache) > self.max_models or
+                    (self.max_bytes is not None and self._cache_bytes > self.max_bytes)):
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted_size
@@ -0,0 +1,146 @@
+"""
+Request and response models of the IntelliInspect ML service.
+Kept free of the training libraries so inference-only workers can import them.
+"""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+# XGBoost parameters a "custom" profile may set next to num_boost_round, early_stopping_rounds and
+# validation_fraction; the objective, class count, tree method and threads are chosen by the service
+CUSTOM_TRAINING_PARAMS = frozenset({
+    'learning_rate', 'eta', 'max_depth', 'max_leaves', 'max_bin', 'grow_policy', 'min_child_weight',
+    'max_delta_step', 'gamma', 'min_split_loss', 'subsample', 'sampling_method', 'colsample_bytree',
+    'colsample_bylevel', 'colsample_bynode', 'lambda', 'reg_lambda', 'alpha', 'reg_alpha', 'scale_pos_weight',
+    'num_parallel_tree', 'max_cat_to_onehot', 'base_score', 'eval_metric', 'seed',
+    'num_boost_round', 'early_stopping_rounds', 'validation_fraction',
+})
+
+class TrainingOptions(BaseModel):
+    # Feed XGBoost a CSR matrix instead of a dense one (zeros are treated as missing)
+    sparse_features: bool = False
+    # "small" suits the demo datasets, "large" production volumes; "custom" starts from
+    # "small" and applies training_params (XGBoost params plus num_boost_round,
+    # early_stopping_rounds and validation_fraction)
+    training_profile: Literal['small', 'large', 'custom'] = 'small'
+    training_params: Optional[Dict[str, Any]] = None
+    # Return the stored result of an identical earlier training (same rows and options)
+    use_cache: bool = True
+    # Binary models predict class 1 when P(class 1) > decision_threshold; stored with the model
+    decision_threshold: float = 0.5
+    # Thresholds in the evaluation sweep (at least 2), evenly spaced over [0, 1]; None sweeps every distinct score
+    evaluation_curve_points: Optional[int] = 101
+    # "random" re-splits all rows, "supplied" keeps the given training/testing boundary and
+    # "time" holds out the most recent rows by the timestamp column
+    split_mode: Literal['random', 'supplied', 'time'] = 'random'
+    # /train/upload only: stream the files in chunks into an XGBoost external-memory DMatrix
+    external_memory: bool = False
+
+
+class TrainingRequest(TrainingOptions):
+    dataset_id: str
+    training_data: List[Dict[str, Any]]
+    testing_data: List[Dict[str, Any]]
+
+
+class IncrementalTrainingRequest(BaseModel):
+    model_id: str
+    dataset_id: Optional[str] = None
+    # Only the new rows; testing_data defaults to a 20% hold-out of training_data
+    training_data: List[Dict[str, Any]]
+    testing_data: List[Dict[str, Any]] = []
+    # Boosting rounds added on top of the existing trees (default: the model's own round count)
+    num_boost_round: Optional[int] = None
+
+
+class PredictionRequest(BaseModel):
+    model_id: str
+    data: Dict[str, Any]
+    # Overrides the model's decision threshold (binary models only)
+    threshold: Optional[float] = None
+
+
+class ThresholdSweep(BaseModel):
+    # Parallel lists, one entry per threshold
+    thresholds: List[float]
+    precision: List[float]
+    recall: List[float]
+    false_positive_rate: List[float]
+
+
+class CalibrationBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+    mean_predicted: float
+    fraction_positive: float
+
+
+class EvaluationReport(BaseModel):
+    roc_auc: Optional[float] = None
+    pr_auc: Optional[float] = None
+    threshold_sweep: ThresholdSweep
+    calibration: List[CalibrationBin]
+
+
+class TrainingResponse(BaseModel):
+    model_id: str
+    accuracy: float
+    precision: float
+    recall: float
+    f1_score: float
+    confusion_matrix: List[List[int]]
+    training_profile: str = 'small'
+    training_params: Dict[str, Any] = {}
+    num_boost_rounds: int = 0
+    fit_time_seconds: float = 0.0
+    cached: bool = False
+    parent_model_id: Optional[str] = None
+    decision_threshold: float = 0.5
+    # Binary models only; computed on the test split
+    evaluation: Optional[EvaluationReport] = None
+
+
+class TrainingJobStatus(BaseModel):
+    job_id: str
+    status: str  # queued, running, completed, failed
+    stage: str
+    progress: float
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    result: Optional[TrainingResponse] = None
+
+
+class PredictionResponse(BaseModel):
+    prediction: int
+    confidence: float
+
+
+class BatchPredictionRequest(BaseModel):
+    model_id: str
+    # Either a list of row dicts or a columnar payload ({column: [values...]})
+    rows: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, List[Any]]] = None
+    threshold: Optional[float] = None
+
+
+class SimulationRequest(BatchPredictionRequest):
+    # Rows per scored chunk, defaults to SIMULATION_CHUNK_ROWS
+    chunk_size: Optional[int] = None
+
+
+class BatchPredictionItem(BaseModel):
+    index: int
+    prediction: Optional[int] = None
+    confidence: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    model_id: str
+    total: int
+    error_count: int
+    predictions: List[BatchPredictionItem]
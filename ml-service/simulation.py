@@ -0,0 +1,75 @@
+"""
+Streaming scoring of a whole simulation batch.
+Rows are scored in vectorized chunks and each chunk is written out as NDJSON as
+soon as it is scored: one line per row with its prediction, confidence and the
+running pass/fail statistics, then a summary line. Only depends on the standard library.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Rows scored per vectorized call; smaller chunks reach the client sooner
+SIMULATION_CHUNK_ROWS = int(os.environ.get("SIMULATION_CHUNK_ROWS", "1000"))
+MEDIA_TYPE = 'application/x-ndjson'
+
+Result = Tuple[Optional[int], Optional[float], Optional[str]]
+
+# Line of a scored row; formatting it directly is several times faster than json.dumps per row
+# (floats use repr, which is what json.dumps writes for finite values)
+SCORED_ROW = ('{"index": %d, "prediction": %d, "confidence": %r, "error": null, "processed": %d, '
+              '"passed": %d, "failed": %d, "errors": %d, "pass_rate": %r, "mean_confidence": %r}')
+
+
+class RunningStats:
+    """Pass (prediction 1) / fail counts and mean confidence over the rows scored so far"""
+
+    def __init__(self):
+        self.processed = 0
+        self.passed = 0
+        self.failed = 0
+        self.errors = 0
+        self.confidence_sum = 0.0
+
+    def add(self, prediction: Optional[int], confidence: Optional[float]):
+        self.processed += 1
+        if prediction is None:
+            self.errors += 1
+            return
+        if prediction == 1:
+            self.passed += 1
+        else:
+            self.failed += 1
+        self.confidence_sum += confidence
+
+    def as_dict(self) -> Dict[str, Any]:
+        scored = self.passed + self.failed
+        return {
+            'processed': self.processed,
+            'passed': self.passed,
+            'failed': self.failed,
+            'errors': self.errors,
+            'pass_rate': self.passed / scored if scored else None,
+            'mean_confidence': self.confidence_sum / scored if scored else None,
+        }
+
+
+def stream_results(chunk_results: Iterable[List[Result]]) -> Iterator[bytes]:
+    """NDJSON for every scored chunk, in order, followed by a {"done": true, ...} summary line.
+    chunk_results is consumed lazily, so each chunk is scored only when the client is ready for it"""
+    stats = RunningStats()
+    for results in chunk_results:
+        lines = []
+        for prediction, confidence, error in results:
+            index = stats.processed
+            stats.add(prediction, confidence)
+            if error is not None:
+                lines.append(json.dumps(dict(index=index, prediction=prediction, confidence=confidence,
+                                             error=error, **stats.as_dict())))
+                continue
+            scored = stats.passed + stats.failed
+            lines.append(SCORED_ROW % (index, prediction, confidence, stats.processed, stats.passed, stats.failed,
+                                       stats.errors, stats.passed / scored, stats.confidence_sum / scored))
+        if lines:
+            yield ('\n'.join(lines) + '\n').encode()
+    yield (json.dumps(dict(done=True, **stats.as_dict())) + '\n').encode()
@@ -0,0 +1,545 @@
+"""
+Training pipeline of the IntelliInspect ML service.
+Imported on the first training request, so pandas, scikit-learn and the rest of
+the training stack are not loaded by workers that only serve predictions.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+
+from encoding import CategoricalEncoder
+from evaluation import binary_report, classification_metrics
+from metrics import TRAINING_CACHE
+from predictor import CompiledPredictor
+from registry import ModelRegistry
+from schemas import TrainingOptions, TrainingResponse
+
+logger = logging.getLogger("ml_service")
+
+# Results of finished trainings keyed by a fingerprint of the data and options, so
+# re-running the same training returns the stored model instead of refitting
+TRAINING_CACHE_SIZE = int(os.environ.get("TRAINING_CACHE_SIZE", "32"))
+training_cache = OrderedDict()  # fingerprint -> TrainingResponse
+training_cache_lock = threading.Lock()
+
+# Wide datasets are pruned to the most populated features before training
+WIDE_FEATURE_THRESHOLD = 500
+WIDE_FEATURE_LIMIT = 300
+LOW_VARIANCE_THRESHOLD = float(os.environ.get("LOW_VARIANCE_THRESHOLD", "0.0"))
+FEATURE_SCAN_CHUNK = 256
+
+# XGBoost training profiles; every profile uses the histogram method
+TRAINING_PROFILES = {
+    'small': {
+        'max_depth': 3,  # Prevent overfitting on small data
+        'learning_rate': 0.1,
+        'max_bin': 256,
+        'num_boost_round': 50,  # Fewer trees for small data
+        'early_stopping_rounds': None,
+        'validation_fraction': 0.0,
+    },
+    'large': {
+        'max_depth': 6,
+        'learning_rate': 0.1,
+        'max_bin': 256,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'num_boost_round': 500,
+        'early_stopping_rounds': 20,
+        'validation_fraction': 0.1,
+    },
+}
+# Size of the service's training pool (read here only) and the threads per fit, sharing the
+# CPUs between its concurrent jobs
+TRAINING_MAX_WORKERS = int(os.environ.get("TRAINING_MAX_WORKERS", "1"))
+TRAINING_NTHREAD = int(os.environ.get("TRAINING_NTHREAD", "0")) or max(1, (os.cpu_count() or 1) // TRAINING_MAX_WORKERS)
+
+def records_to_frames(training_data: List[Dict[str, Any]], testing_data: List[Dict[str, Any]]):
+    return pd.DataFrame(training_data), pd.DataFrame(testing_data)
+
+def training_fingerprint(frames: List[pd.DataFrame], options: TrainingOptions) -> str:
+    # Row hashes in order (the split depends on it) plus column names, dtypes and options
+    digest = hashlib.blake2b(digest_size=20)
+    for df in frames:
+        digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+        digest.update(len(df).to_bytes(8, 'little'))
+        if len(df.columns):
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(options.model_dump_json(exclude={'use_cache'}).encode())
+    return digest.hexdigest()
+
+def file_fingerprint(paths: List[str], formats: List[str], options: TrainingOptions) -> str:
+    # Uploaded files are hashed as stored, so a cache lookup never has to parse them
+    digest = hashlib.blake2b(digest_size=20)
+    for path, file_format in zip(paths, formats):
+        digest.update(file_format.encode())
+        digest.update(os.path.getsize(path).to_bytes(8, 'little'))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    digest.update(options.model_dump_json(exclude={'use_cache'}).encode())
+    return digest.hexdigest()
+
+def get_cached_training(registry: ModelRegistry, fingerprint: str) -> Optional[TrainingResponse]:
+    with training_cache_lock:
+        result = training_cache.get(fingerprint)
+        if result is None:
+            return None
+        # Models removed from the registry invalidate their cache entry
+        if not registry.exists(result.model_id):
+            del training_cache[fingerprint]
+            return None
+        training_cache.move_to_end(fingerprint)
+        return result
+
+def store_cached_training(fingerprint: str, result: TrainingResponse):
+    with training_cache_lock:
+        training_cache[fingerprint] = result
+        training_cache.move_to_end(fingerprint)
+        while len(training_cache) > TRAINING_CACHE_SIZE:
+            training_cache.popitem(last=False)
+
+def lookup_training_cache(registry: ModelRegistry, dataset_id: str, options: TrainingOptions,
+                          fingerprint: Callable[[], str]) -> Tuple[Optional[str], Optional[TrainingResponse]]:
+    # Runs before a job is queued, so a hit never waits for a training worker; returns the
+    # fingerprint to store a fresh result under (None when caching is off) and the cached result
+    if not options.use_cache or TRAINING_CACHE_SIZE <= 0:
+        TRAINING_CACHE.inc(result='bypass')
+        return None, None
+    key = fingerprint()
+    result = get_cached_training(registry, key)
+    TRAINING_CACHE.inc(result='miss' if result is None else 'hit')
+    if result is None:
+        return key, None
+    logger.info("Training cache hit for dataset %s, returning model %s", dataset_id, result.model_id)
+    return key, result.model_copy(update={'cached': True})
+
+def train_with_cache(registry: ModelRegistry, dataset_id: str, options: TrainingOptions, fingerprint: Optional[str],
+                     frames: List[pd.DataFrame], report_progress=lambda stage: None) -> TrainingResponse:
+    result = train_model(registry, dataset_id, frames, options, report_progress)
+    if fingerprint is not None:
+        store_cached_training(fingerprint, result)
+    return result
+
+def scan_feature_columns(df: pd.DataFrame, columns: List[str]):
+    # Non-zero counts and variances (missing values count as 0), computed in column
+    # chunks so a wide frame is never converted into one dense matrix
+    nonzero = np.zeros(len(columns), dtype=np.int64)
+    variance = np.full(len(columns), np.inf)
+    numeric = [i for i, col in enumerate(columns) if pd.api.types.is_numeric_dtype(df[col])]
+    for start in range(0, len(numeric), FEATURE_SCAN_CHUNK):
+        positions = numeric[start:start + FEATURE_SCAN_CHUNK]
+        block = df[[columns[i] for i in positions]].to_numpy(dtype=np.float64, na_value=0.0)
+        nonzero[positions] = np.count_nonzero(block, axis=0)
+        variance[positions] = block.var(axis=0)
+    
+    numeric_positions = set(numeric)
+    for i, col in enumerate(columns):
+        if i not in numeric_positions:
+            values = df[col]
+            nonzero[i] = (values.notna() & (values != 0)).sum()
+            variance[i] = 0.0 if values.fillna(0).nunique() <= 1 else np.inf
+    return nonzero, variance
+
+def select_wide_features(df: pd.DataFrame, columns: List[str]) -> List[str]:
+    nonzero, variance = scan_feature_columns(df, columns)
+    
+    # Drop all-zero and (near) constant columns, then keep the most populated ones
+    keep = (nonzero > 0) & (variance > LOW_VARIANCE_THRESHOLD)
+    logger.info("Dropping %d all-zero or low-variance features", int((~keep).sum()))
+    counts = pd.Series(nonzero[keep], index=[col for col, kept in zip(columns, keep) if kept])
+    return counts.nlargest(WIDE_FEATURE_LIMIT).index.tolist()
+
+def fill_missing(df: pd.DataFrame) -> pd.DataFrame:
+    # Fill column by column so only columns that have gaps are rewritten
+    for col in df.columns:
+        if df[col].hasnans:
+            df[col] = df[col].fillna(0)
+    return df
+
+def to_csr(df: pd.DataFrame):
+    # Converted column by column through pandas' sparse dtype, never as one dense float matrix
+    return df.astype(pd.SparseDtype(np.float32, 0)).sparse.to_coo().tocsr()
+
+def resolve_training_params(options: TrainingOptions, n_classes: int):
+    profile = 'small' if options.training_profile == 'custom' else options.training_profile
+    settings = dict(TRAINING_PROFILES[profile])
+    if options.training_profile == 'custom':
+        settings.update(options.training_params or {})
+    
+    num_boost_round = int(settings.pop('num_boost_round'))
+    early_stopping_rounds = settings.pop('early_stopping_rounds')
+    validation_fraction = float(settings.pop('validation_fraction'))
+    
+    params = {
+        'tree_method': 'hist',
+        'nthread': TRAINING_NTHREAD,
+        'seed': 42,
+    }
+    if n_classes > 2:
+        params.update(objective='multi:softprob', num_class=n_classes, eval_metric='mlogloss')
+    else:
+        params.update(objective='binary:logistic', eval_metric='logloss')
+    params.update(settings)
+    return params, num_boost_round, early_stopping_rounds, validation_fraction
+
+def detect_target_column(columns) -> str:
+    # Smart target column detection - look for common target names or last column
+    for col in columns:
+        if col.lower() in ['quality', 'pass', 'fail', 'status', 'result', 'target', 'label', 'response', 'output', 'class', 'y']:
+            return col
+    return columns[-1]
+
+def select_feature_columns(columns, target_column: str) -> List[str]:
+    # Remove timestamp columns and ID columns if they exist
+    return [col for col in columns
+            if col != target_column and
+            'timestamp' not in col.lower() and
+            'time' not in col.lower() and
+            'date' not in col.lower() and
+            col.lower() != 'id']
+
+def detect_timestamp_column(columns) -> str:
+    for keyword in ('timestamp', 'time', 'date'):
+        for col in columns:
+            if keyword in col.lower():
+                return col
+    raise ValueError("split_mode 'time' needs a timestamp column")
+
+def parse_timestamps(df: pd.DataFrame, column: str) -> np.ndarray:
+    # Nanoseconds since the epoch; rows must all carry a valid time to be ordered
+    times = pd.to_datetime(df[column], errors='coerce')
+    if times.isna().any():
+        raise ValueError(f"Column '{column}' has {int(times.isna().sum())} missing or unparseable timestamp(s)")
+    if getattr(times.dt, 'tz', None) is not None:
+        times = times.dt.tz_convert(None)
+    return times.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+def split_test_size(n_rows: int) -> float:
+    # Larger test share for tiny datasets so the metrics mean something
+    return max(0.3, 8/n_rows) if n_rows < 50 else 0.2
+
+def fit_booster(params: Dict[str, Any], X_train, y_train: np.ndarray, missing: float, num_boost_round: int,
+                early_stopping_rounds: Optional[int], validation_fraction: float, xgb_model=None):
+    # Early stopping watches a validation slice of the training rows, so the
+    # test split stays unseen for the reported metrics
+    evals = []
+    X_fit, y_fit = X_train, y_train
+    if early_stopping_rounds and validation_fraction > 0 and len(y_train) >= 10:
+        n_valid = max(1, int(len(y_train) * validation_fraction))
+        order = np.random.RandomState(42).permutation(len(y_train))
+        fit_rows, valid_rows = order[n_valid:], order[:n_valid]
+        X_fit, y_fit = X_train[fit_rows], y_train[fit_rows]
+        evals = [(X_train[valid_rows], y_train[valid_rows])]
+    
+    fit_start = time.perf_counter()
+    dtrain = xgb.QuantileDMatrix(X_fit, label=y_fit, missing=missing, max_bin=params['max_bin'])
+    watchlist = [(xgb.QuantileDMatrix(X_valid, label=y_valid, missing=missing, ref=dtrain), 'validation')
+                 for X_valid, y_valid in evals]
+    # xgb_model continues boosting from an existing booster instead of starting from scratch
+    booster = xgb.train(
+        params,
+        dtrain,
+        num_boost_round=num_boost_round,
+        evals=watchlist,
+        early_stopping_rounds=early_stopping_rounds if watchlist else None,
+        verbose_eval=False,
+        xgb_model=xgb_model
+    )
+    if watchlist and booster.best_iteration + 1 < booster.num_boosted_rounds():
+        # Keep only the trees up to the best validation score
+        booster = booster[:booster.best_iteration + 1]
+    return booster, time.perf_counter() - fit_start
+
+def evaluate_booster(booster, X_test, y_test: np.ndarray, missing: float, threshold: float = 0.5,
+                     curve_points: Optional[int] = 101) -> Dict[str, Any]:
+    # Metric fields of the TrainingResponse, from one prediction pass over the test split
+    return evaluate_predictions(y_test, booster.inplace_predict(X_test, missing=missing), threshold, curve_points)
+
+def evaluate_predictions(y_test: np.ndarray, y_pred_proba: np.ndarray, threshold: float = 0.5,
+                         curve_points: Optional[int] = 101) -> Dict[str, Any]:
+    report = None
+    if y_pred_proba.ndim > 1:
+        y_pred = y_pred_proba.argmax(axis=1)
+    else:
+        y_pred = (y_pred_proba > threshold).astype(np.int64)
+        report = binary_report(y_test, y_pred_proba, curve_points)
+    
+    metrics = classification_metrics(y_test, y_pred)
+    logger.info("Final metrics - Accuracy: %.3f, Precision: %.3f, Recall: %.3f, F1: %.3f",
+                metrics['accuracy'], metrics['precision'], metrics['recall'], metrics['f1_score'])
+    return dict(metrics, evaluation=report)
+
+def train_model(registry: ModelRegistry, dataset_id: str, frames: List[pd.DataFrame],
+                options: TrainingOptions, report_progress=lambda stage: None) -> TrainingResponse:
+    try:
+        # Combine data for better training with small datasets
+        n_supplied_train = len(frames[0])
+        all_data = pd.concat(frames, ignore_index=True)
+        frames.clear()
+        
+        target_column = detect_target_column(all_data.columns)
+        feature_columns = select_feature_columns(all_data.columns, target_column)
+        timestamps = None
+        if options.split_mode == 'time':
+            timestamps = parse_timestamps(all_data, detect_timestamp_column(all_data.columns))
+        
+        # Handle very wide datasets (limit features for memory management)
+        if len(feature_columns) > WIDE_FEATURE_THRESHOLD:
+            logger.info("Wide dataset detected (%d features), selecting top %d features",
+                        len(feature_columns), WIDE_FEATURE_LIMIT)
+            feature_columns = select_wide_features(all_data, feature_columns)
+        
+        logger.info("Training on %d rows x %d columns, target column '%s', %d features",
+                    all_data.shape[0], all_data.shape[1], target_column, len(feature_columns))
+        
+        # Prepare features and target; only the selected columns are copied and then
+        # missing values are filled in place (0 for numerical data)
+        X = fill_missing(all_data[feature_columns].copy())
+        y = all_data[target_column].fillna(0)
+        del all_data
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Target values: %s", y.value_counts().to_dict())
+        
+        report_progress('splitting')
+        
+        # Split into train/test (use larger test set for better metrics)
+        test_size = split_test_size(len(X))
+        
+        if options.split_mode == 'supplied':
+            # Keep the boundary the caller drew between training_data and testing_data
+            if n_supplied_train == 0 or n_supplied_train == len(X):
+                raise ValueError("split_mode 'supplied' needs both training and testing rows")
+            train_rows, test_rows = slice(0, n_supplied_train), slice(n_supplied_train, None)
+            X_train, X_test = X.iloc[train_rows].copy(), X.iloc[test_rows].copy()
+            y_train, y_test = y.iloc[train_rows], y.iloc[test_rows]
+        elif options.split_mode == 'time':
+            # The most recent rows are the test set, so the model is scored on its own future
+            order = np.argsort(timestamps, kind='stable')
+            n_test = int(np.ceil(len(X) * test_size))
+            X_train, X_test = X.take(order[:-n_test]), X.take(order[-n_test:])
+            y_train, y_test = y.take(order[:-n_test]), y.take(order[-n_test:])
+            del timestamps
+        else:
+            # Safely handle stratification
+            try:
+                if len(y.unique()) > 1 and len(y) >= 4:  # Need at least 2 samples per class
+                    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42, stratify=y)
+                else:
+                    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+            except Exception as split_error:
+                logger.warning("Stratified split failed: %s, using regular split", split_error)
+                X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+        del X, y
+        
+        report_progress('encoding')
+        
+        # Encode categorical variables; unseen test values map to the encoder's reserved code
+        label_encoders = {}
+        for col in X_train.columns:
+            if X_train[col].dtype == 'object':
+                encoder = CategoricalEncoder()
+                X_train[col] = encoder.fit_transform(X_train[col])
+                X_test[col] = encoder.transform(X_test[col])
+                label_encoders[col] = encoder
+                
+                logger.debug("Column %s - Training classes: %d, Handled unseen values in test", col, len(encoder.classes_))
+        
+        # Encode target variable if necessary with the same unseen value handling
+        target_encoder = None
+        if y_train.dtype == 'object':
+            target_encoder = CategoricalEncoder()
+            y_train = target_encoder.fit_transform(y_train)
+            y_test = target_encoder.transform(y_test)
+            
+            logger.debug("Target variable - Training classes: %s, Test handled", target_encoder.classes_)
+        
+        logger.info("Training set shape: %s, Test set shape: %s", X_train.shape, X_test.shape)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Training target distribution: %s", pd.Series(y_train).value_counts().to_dict())
+            logger.debug("Test target distribution: %s", pd.Series(y_test).value_counts().to_dict())
+        
+        report_progress('fitting')
+        
+        classes = np.unique(y_train)
+        params, num_boost_round, early_stopping_rounds, validation_fraction = resolve_training_params(options, len(classes))
+        
+        # XGBoost works on float32 internally; convert once instead of per DMatrix
+        missing = 0.0 if options.sparse_features else np.nan
+        if options.sparse_features:
+            # CSR input lets XGBoost skip the zeros of sparse sensor data entirely
+            X_train = to_csr(X_train)
+            X_test = to_csr(X_test)
+        else:
+            X_train = X_train.to_numpy(dtype=np.float32)
+            X_test = X_test.to_numpy(dtype=np.float32)
+        y_train = np.asarray(y_train)
+        y_test = np.asarray(y_test)
+        
+        booster, fit_time = fit_booster(params, X_train, y_train, missing, num_boost_round,
+                                        early_stopping_rounds, validation_fraction)
+        
+        logger.info("Fitted %d rounds in %.2fs with params %s", booster.num_boosted_rounds(), fit_time, params)
+        
+        report_progress('evaluating')
+        
+        metrics = evaluate_booster(booster, X_test, y_test, missing, options.decision_threshold,
+                                   options.evaluation_curve_points)
+        
+        # Persist model and metadata
+        model_id = str(uuid.uuid4())
+        class_labels = target_encoder.classes_.tolist() if target_encoder is not None else classes.tolist()
+        predictor = CompiledPredictor(booster, feature_columns, label_encoders, class_labels, missing,
+                                      options.decision_threshold)
+        registry.save(model_id, predictor, {
+            'dataset_id': dataset_id,
+            'created_at': datetime.now().isoformat(),
+            'training_profile': options.training_profile,
+            'training_params': params,
+            'target_column': target_column,
+            'num_boost_round': num_boost_round,
+            'early_stopping_rounds': early_stopping_rounds,
+            'validation_fraction': validation_fraction
+        })
+        
+        logger.info("Stored model %s, models in memory: %d", model_id, registry.resident_count())
+        
+        return TrainingResponse(
+            model_id=model_id,
+            **metrics,
+            training_profile=options.training_profile,
+            training_params=dict(params, num_boost_round=num_boost_round,
+                                 early_stopping_rounds=early_stopping_rounds,
+                                 validation_fraction=validation_fraction),
+            num_boost_rounds=booster.num_boosted_rounds(),
+            fit_time_seconds=fit_time,
+            decision_threshold=options.decision_threshold
+        )
+        
+    except Exception as e:
+        logger.exception("Training failed for dataset %s", dataset_id)
+        raise RuntimeError(f"Training failed: {str(e)}") from e
+
+def train_incremental(registry: ModelRegistry, parent_model_id: str, dataset_id: Optional[str],
+                      num_boost_round: Optional[int], frames: List[pd.DataFrame],
+                      report_progress=lambda stage: None) -> TrainingResponse:
+    # Continues boosting a stored model on new rows with its own encoders, feature
+    # columns and XGBoost params, so the cost grows with the new data only
+    try:
+        metadata = registry.load_metadata(parent_model_id)
+        predictor = registry.get(parent_model_id)
+        if predictor is None:
+            raise ValueError(f"Model {parent_model_id} not found")
+        
+        train_df, test_df = frames
+        frames.clear()
+        target_column = metadata['target_column']
+        feature_columns = predictor.feature_columns
+        missing_columns = [col for col in feature_columns + [target_column] if col not in train_df.columns]
+        if missing_columns:
+            raise ValueError(f"New rows are missing column(s): {', '.join(missing_columns)}")
+        
+        report_progress('splitting')
+        
+        X = fill_missing(train_df[feature_columns].copy())
+        y = encode_class_labels(train_df[target_column].fillna(0), predictor.class_labels)
+        del train_df
+        if len(test_df):
+            X_train, y_train = X, y
+            X_test = fill_missing(test_df[feature_columns].copy())
+            y_test = encode_class_labels(test_df[target_column].fillna(0), predictor.class_labels)
+        else:
+            # No separate test rows: hold out part of the new rows for the metrics
+            stratify = y if len(np.unique(y)) > 1 and np.bincount(y).min() >= 2 and len(y) >= 10 else None
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42,
+                                                                stratify=stratify)
+        del X, y, test_df
+        
+        report_progress('encoding')
+        
+        # Reuse the parent's encoders; categories it never saw get their reserved code
+        for col, encoder in predictor.encoders.items():
+            X_train[col] = encoder.transform(X_train[col])
+            X_test[col] = encoder.transform(X_test[col])
+        
+        report_progress('fitting')
+        
+        missing = predictor.missing
+        if missing == 0.0:
+            X_train = to_csr(X_train)
+            X_test = to_csr(X_test)
+        else:
+            X_train = X_train.to_numpy(dtype=np.float32)
+            X_test = X_test.to_numpy(dtype=np.float32)
+        
+        params = dict(metadata['training_params'], nthread=TRAINING_NTHREAD)
+        rounds = num_boost_round or metadata['num_boost_round']
+        early_stopping_rounds = metadata['early_stopping_rounds']
+        validation_fraction = metadata['validation_fraction']
+        parent_rounds = predictor.booster.num_boosted_rounds()
+        booster, fit_time = fit_booster(params, X_train, np.asarray(y_train), missing, rounds,
+                                        early_stopping_rounds, validation_fraction, xgb_model=predictor.booster)
+        
+        logger.info("Added %d rounds to model %s in %.2fs", booster.num_boosted_rounds() - parent_rounds,
+                    parent_model_id, fit_time)
+        
+        report_progress('evaluating')
+        
+        metrics = evaluate_booster(booster, X_test, np.asarray(y_test), missing, predictor.threshold)
+        
+        model_id = str(uuid.uuid4())
+        registry.save(model_id, CompiledPredictor(booster, feature_columns, predictor.encoders,
+                                                  predictor.class_labels, missing, predictor.threshold), {
+            'dataset_id': dataset_id or metadata['dataset_id'],
+            'created_at': datetime.now().isoformat(),
+            'training_profile': metadata['training_profile'],
+            'training_params': params,
+            'target_column': target_column,
+            'num_boost_round': rounds,
+            'early_stopping_rounds': early_stopping_rounds,
+            'validation_fraction': validation_fraction,
+            'parent_model_id': parent_model_id
+        })
+        
+        logger.info("Stored model %s continued from %s", model_id, parent_model_id)
+        
+        return TrainingResponse(
+            model_id=model_id,
+            **metrics,
+            training_profile=metadata['training_profile'],
+            training_params=dict(params, num_boost_round=rounds, early_stopping_rounds=early_stopping_rounds,
+                                 validation_fraction=validation_fraction),
+            num_boost_rounds=booster.num_boosted_rounds(),
+            fit_time_seconds=fit_time,
+            parent_model_id=parent_model_id,
+            decision_threshold=predictor.threshold
+        )
+    
+    except Exception as e:
+        logger.exception("Incremental training of model %s failed", parent_model_id)
+        raise RuntimeError(f"Incremental training failed: {str(e)}") from e
+
+def encode_class_labels(values: pd.Series, class_labels: List[Any]) -> np.ndarray:
+    # Map target values onto the parent model's class codes
+    if values.dtype == 'object':
+        codes = pd.Index([str(label) for label in class_labels]).get_indexer(values.astype(str))
+    else:
+        codes = pd.Index(class_labels).get_indexer(values)
+    if (codes < 0).any():
+        unknown = sorted(set(values[codes < 0].astype(str)))
+        raise ValueError(f"Target value(s) not known to the model: {', '.join(unknown[:10])}")
+    return codes.astype(np.int64)